@@ -0,0 +1,243 @@
+"""
+Headless benchmark of the engine pipeline — no camera, no display, no
+real mouse. Frames come from a synthetic hand or a video file, cursor and
+clicks go to a RecordingBackend, and the overlay is either skipped or
+rendered offscreen.
+
+    python bench.py                                        # synthetic + stub detector
+    python bench.py --overlay offscreen --out results/base.json
+    python bench.py --source talk.mp4 --detector mediapipe --frames 900
+    python bench.py --source recordings/session_20250101_120000 --detector mediapipe
+    python bench.py --compare results/base.json results/new.json
+
+Runs are repeatable: the synthetic source is seeded, the engine runs on
+a virtual clock set to each frame's timestamp, the CPU budget governor is
+pinned to its start level and the first --warmup frames are not measured.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from clock import VirtualClock
+from frame_sources import SessionSource, SyntheticHandSource, VideoFileSource, stub_factory
+from hand_engine import build_recognizer, mediapipe_hands
+from input_backends import RecordingBackend
+from overlay import OVERLAY_QUALITY, make_renderer
+from profiling import StageTimer
+from tool_config import load_config, parse_size
+
+
+def make_source(args):
+    if args.source == "synthetic":
+        return SyntheticHandSource(frames=args.frames, width=args.width,
+                                   height=args.height, seed=args.seed)
+    if os.path.isdir(args.source):
+        return SessionSource(args.source, frames=args.frames)
+    return VideoFileSource(args.source, frames=args.frames)
+
+
+def make_pipeline(args, cfg, source, profiler):
+    clock = VirtualClock()
+    backend = RecordingBackend(screen_size=args.screen, clock=clock)
+    if args.detector == "stub":
+        if not isinstance(source, SyntheticHandSource):
+            sys.exit("the stub detector needs the synthetic source (it replays its landmarks)")
+        factory = stub_factory(source, args.stub_ms / 1000.0)
+    else:
+        factory = mediapipe_hands
+    recognizer = build_recognizer(cfg, None, backend, profiler, factory, clock)
+    renderer = make_renderer(cfg.get("overlay", {}), args.screen, (args.width, args.height)) \
+        if args.overlay == "offscreen" else None
+    return recognizer, renderer
+
+
+def run_pass(recognizer, renderer, source, warmup, track_alloc=False):
+    prof = recognizer.profiler
+    frames = 0
+    busy = 0.0
+    alloc_peaks = []
+    clock = recognizer.clock
+    for seq, (t, frame, _) in enumerate(source, 1):
+        if seq == warmup + 1:
+            prof.reset()
+            recognizer.backend.clear()
+            frames, busy = 0, 0.0
+        if track_alloc:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+        t0 = time.perf_counter()
+        clock.set(t)
+        recognizer.process_frame(seq, frame, clock.now())
+        if renderer is not None:
+            t = time.perf_counter()
+            renderer.render(frame)
+            t = prof.lap("overlay_convert", t, seq)
+            if renderer.divisor > 1:
+                renderer.zoom()
+                prof.lap("overlay_zoom", t, seq)
+        busy += time.perf_counter() - t0
+        frames += 1
+
+        if track_alloc and seq > warmup:
+            alloc_peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    return frames, busy, alloc_peaks
+
+
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench(args):
+    cfg = load_config(args.config, pinned=True)
+    if args.overlay_quality:
+        cfg.setdefault("overlay", {})["quality"] = args.overlay_quality
+    if args.overlay_mode:
+        cfg.setdefault("overlay", {})["mode"] = args.overlay_mode
+
+    # — timing pass —
+    profiler = StageTimer(enabled=True)
+    source = make_source(args)
+    recognizer, renderer = make_pipeline(args, cfg, source, profiler)
+    gc_before = [s["collections"] for s in gc.get_stats()]
+    frames, busy, _ = run_pass(recognizer, renderer, source, args.warmup)
+    gc_after = [s["collections"] for s in gc.get_stats()]
+    backend = recognizer.backend
+
+    # — allocation pass (tracemalloc slows everything, so it runs apart) —
+    alloc = {}
+    if args.alloc_frames and hasattr(tracemalloc, "reset_peak"):   # Python 3.9+
+        args_alloc = argparse.Namespace(**{**vars(args), "frames": args.alloc_frames})
+        source = make_source(args_alloc)
+        rec2, ren2 = make_pipeline(args_alloc, cfg, source, StageTimer())
+        tracemalloc.start()
+        _, _, peaks = run_pass(rec2, ren2, source, min(args.warmup, args.alloc_frames // 2),
+                               track_alloc=True)
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        if peaks:
+            alloc = {
+                "frames": len(peaks),
+                "mean_transient_kb_per_frame": sum(peaks) / len(peaks) / 1024,
+                "max_transient_kb_per_frame": max(peaks) / 1024,
+                "traced_peak_mb": traced_peak / (1024 * 1024),
+            }
+
+    return {
+        "meta": {
+            "args": {k: v for k, v in vars(args).items() if k != "compare"},
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "frames": frames,
+        "fps": frames / busy if busy else None,
+        "ms_per_frame": 1000.0 * busy / frames if frames else None,
+        "stages": profiler.summary(),
+        "memory": {"max_rss_mb": max_rss_mb(), **alloc},
+        "gc_collections": [a - b for a, b in zip(gc_after, gc_before)],
+        "input": {
+            "moves_sent": backend.moves_sent,
+            "moves_dropped": backend.moves_dropped,
+            "buttons": sum(1 for e in backend.events if e[1] != "move"),
+        },
+        # model switches, and how often the switched-to model lost a
+        # tracked hand on its first frame (stale tracking region)
+        "models": {
+            "switches": recognizer.model_switches,
+            "misses_after_switch": recognizer.switch_misses,
+        },
+    }
+
+
+def print_result(res):
+    print(f"frames {res['frames']}   {res['fps']:.1f} FPS   {res['ms_per_frame']:.3f} ms/frame")
+    print(f"{'stage':<16}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    for stage, s in res["stages"].items():
+        print(f"{stage:<16}{s['count']:>8}{s['mean_ms']:>10.3f}"
+              f"{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}{s['p99_ms']:>10.3f}")
+    print("memory", json.dumps(res["memory"]))
+    print("gc collections (gen 0/1/2)", res["gc_collections"])
+    print("input", json.dumps(res["input"]))
+    if "models" in res:
+        print("models", json.dumps(res["models"]))
+
+
+def compare(path_a, path_b):
+    a, b = load_config(path_a), load_config(path_b)
+
+    def pct(x, y):
+        return f"{100.0 * (y - x) / x:+.1f}%" if x else "n/a"
+
+    print(f"{'':<30}{'A':>12}{'B':>12}{'change':>10}")
+    print(f"{'fps':<30}{a['fps']:>12.1f}{b['fps']:>12.1f}{pct(a['fps'], b['fps']):>10}")
+    for stage in a["stages"]:
+        if stage not in b["stages"]:
+            continue
+        for key in ("mean_ms", "p95_ms"):
+            x, y = a["stages"][stage][key], b["stages"][stage][key]
+            print(f"{stage + ' ' + key[:-3]:<30}{x:>12.3f}{y:>12.3f}{pct(x, y):>10}")
+    for key in ("max_rss_mb", "mean_transient_kb_per_frame"):
+        x, y = a["memory"].get(key), b["memory"].get(key)
+        if x is not None and y is not None:
+            print(f"{key:<30}{x:>12.1f}{y:>12.1f}{pct(x, y):>10}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Headless engine pipeline benchmark")
+    ap.add_argument("--source", default="synthetic",
+                    help="'synthetic', a video file or a recorded session directory")
+    ap.add_argument("--detector", choices=("stub", "mediapipe"), default="stub")
+    ap.add_argument("--stub-ms", type=float, default=0.0, help="fake inference time per frame")
+    ap.add_argument("--overlay", choices=("off", "offscreen"), default="off")
+    ap.add_argument("--overlay-quality", choices=tuple(OVERLAY_QUALITY),
+                    help="override the overlay quality from the config")
+    ap.add_argument("--overlay-mode", choices=("mirror", "pip"),
+                    help="override the overlay mode from the config")
+    ap.add_argument("--config", default="session_config.json")
+    ap.add_argument("--frames", type=int, default=600)
+    ap.add_argument("--warmup", type=int, default=30)
+    ap.add_argument("--alloc-frames", type=int, default=120, help="0 skips the allocation pass")
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--screen", type=parse_size, default=(1920, 1080))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="save the result as JSON")
+    ap.add_argument("--compare", nargs=2, metavar=("A", "B"), help="compare two saved results")
+    args = ap.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    res = bench(args)
+    print_result(res)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
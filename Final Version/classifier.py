@@ -0,0 +1,196 @@
+import os
+
+import numpy as np
+
+# Landmarks are normalised per axis, so x is stretched back by the frame's
+# width / height before measuring shapes — 16:9 at "Medium" and "High",
+# 4:3 at "Low". This default is only for callers that do not know it.
+ASPECT = 16 / 9
+
+
+def hand_features(pts, aspect=ASPECT):
+    """
+    (..., 21, 3) landmarks → (..., 40) pose features: x, y of the 20
+    non-wrist points relative to the wrist, rotated so the palm (wrist →
+    middle-finger MCP) points up and scaled by its length. Invariant to
+    where the hand is, how far from the camera and how tilted — provided
+    aspect is the width / height of the frame they were detected in.
+    """
+    xy = pts[..., :2] * (aspect, 1.0)
+    xy = xy[..., 1:, :] - xy[..., :1, :]
+    up = xy[..., 8, :]                                 # wrist → landmark 9
+    scale = np.hypot(up[..., 0], up[..., 1])[..., None]
+    ux, uy = up[..., :1] / scale, up[..., 1:] / scale
+    x = (xy[..., 0] * -uy + xy[..., 1] * ux) / scale
+    y = -(xy[..., 0] * ux + xy[..., 1] * uy) / scale
+    return np.stack([x, y], axis=-1).reshape(pts.shape[:-2] + (40,))
+
+
+class MLPClassifier:
+    """
+    One hidden layer, ReLU, softmax — small enough that a single frame is
+    two tiny matrix products. Trained full-batch with Adam.
+    """
+
+    kind = "mlp"
+
+    def __init__(self, classes, hidden=32, seed=0):
+        self.classes = list(classes)
+        self.hidden = hidden
+        self.rng = np.random.default_rng(seed)
+        self.aspect = ASPECT   # frame aspect of the training data, for reference
+        self.mean = None
+        self.std = None
+        self.w1 = self.b1 = self.w2 = self.b2 = None
+
+    def fit(self, X, y, epochs=400, lr=0.01, l2=1e-4, balance=True):
+        """X (N, F) features, y (N,) class indices."""
+        self.mean, self.std = X.mean(axis=0), X.std(axis=0) + 1e-6
+        X = (X - self.mean) / self.std
+        n, f = X.shape
+        c = len(self.classes)
+        self.w1 = self.rng.normal(0, np.sqrt(2 / f), (f, self.hidden))
+        self.b1 = np.zeros(self.hidden)
+        self.w2 = self.rng.normal(0, np.sqrt(2 / self.hidden), (self.hidden, c))
+        self.b2 = np.zeros(c)
+        onehot = np.eye(c)[y]
+        # "none" dominates real recordings — weight classes equally
+        counts = np.bincount(y, minlength=c).astype(float)
+        weight = (n / (c * np.maximum(counts, 1)))[y] if balance else np.ones(n)
+        weight = weight[:, None] / n
+
+        params = [self.w1, self.b1, self.w2, self.b2]
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        for step in range(1, epochs + 1):
+            h = np.maximum(X @ self.w1 + self.b1, 0)
+            p = self.softmax(h @ self.w2 + self.b2)
+            g_out = (p - onehot) * weight
+            g_h = (g_out @ self.w2.T) * (h > 0)
+            grads = [X.T @ g_h + l2 * self.w1, g_h.sum(axis=0),
+                     h.T @ g_out + l2 * self.w2, g_out.sum(axis=0)]
+            for i, (param, g) in enumerate(zip(params, grads)):
+                m[i] = 0.9 * m[i] + 0.1 * g
+                v[i] = 0.999 * v[i] + 0.001 * g * g
+                param -= lr * (m[i] / (1 - 0.9 ** step)) / (np.sqrt(v[i] / (1 - 0.999 ** step)) + 1e-8)
+        return self
+
+    @staticmethod
+    def softmax(z):
+        z = np.exp(z - z.max(axis=-1, keepdims=True))
+        return z / z.sum(axis=-1, keepdims=True)
+
+    def predict_proba(self, X):
+        h = np.maximum(((X - self.mean) / self.std) @ self.w1 + self.b1, 0)
+        return self.softmax(h @ self.w2 + self.b2)
+
+    def predict(self, X):
+        return self.predict_proba(X).argmax(axis=-1)
+
+    def arrays(self):
+        return {"mean": self.mean, "std": self.std,
+                "w1": self.w1, "b1": self.b1, "w2": self.w2, "b2": self.b2}
+
+    def load_arrays(self, data):
+        for k in ("mean", "std", "w1", "b1", "w2", "b2"):
+            setattr(self, k, data[k])
+        self.hidden = self.w1.shape[1]
+
+
+class KNNClassifier:
+    """
+    k nearest training frames by Euclidean distance in palm units,
+    majority vote. Brute force: at 40 dimensions a KD-tree prunes almost
+    nothing, while one vectorised distance pass over a few thousand stored
+    frames stays well under a millisecond. Training keeps at most
+    `max_samples` frames, evenly over the classes.
+    """
+
+    kind = "knn"
+
+    def __init__(self, classes, k=5, max_samples=4000, seed=0):
+        self.classes = list(classes)
+        self.k = k
+        self.max_samples = max_samples
+        self.rng = np.random.default_rng(seed)
+        self.aspect = ASPECT
+        self.X = self.y = self.norms = None
+
+    def fit(self, X, y, **_):
+        per_class = self.max_samples // len(self.classes)
+        keep = []
+        for c in range(len(self.classes)):
+            idx = np.flatnonzero(y == c)
+            if len(idx) > per_class:
+                idx = self.rng.choice(idx, per_class, replace=False)
+            keep.append(idx)
+        keep = np.concatenate(keep)
+        self.X = X[keep].astype(np.float32)
+        self.y = y[keep]
+        self.norms = (self.X * self.X).sum(axis=1)
+        return self
+
+    def predict_proba(self, X):
+        Z = np.atleast_2d(X).astype(np.float32)
+        # |z|^2 is the same for every neighbour, so it is left out
+        d2 = self.norms - 2 * Z @ self.X.T
+        nearest = np.argpartition(d2, self.k - 1, axis=1)[:, :self.k]
+        votes = self.y[nearest]
+        proba = np.stack([(votes == c).mean(axis=1) for c in range(len(self.classes))], axis=-1)
+        return proba if np.ndim(X) > 1 else proba[0]
+
+    def predict(self, X):
+        return self.predict_proba(X).argmax(axis=-1)
+
+    def arrays(self):
+        return {"X": self.X, "y": self.y, "k": self.k}
+
+    def load_arrays(self, data):
+        self.X, self.y, self.k = data["X"], data["y"], int(data["k"])
+        self.norms = (self.X * self.X).sum(axis=1)
+
+
+MODELS = {"mlp": MLPClassifier, "knn": KNNClassifier}
+
+
+def save_classifier(path, model):
+    np.savez(path, kind=model.kind, classes=np.array(model.classes), aspect=model.aspect,
+             **model.arrays())
+
+
+def load_classifier(path):
+    with np.load(path) as data:
+        model = MODELS[str(data["kind"])](list(data["classes"]))
+        model.load_arrays(data)
+        if "aspect" in data.files:
+            model.aspect = float(data["aspect"])
+    return model
+
+
+class PoseClassifier:
+    """
+    What the recognizer calls per frame: landmarks → pose name. aspect is
+    the current frame's width / height; features are undistorted with it,
+    so a model trained at 720p also reads 640x480 frames correctly.
+    """
+
+    def __init__(self, model, min_proba=0.6):
+        self.model = model
+        self.min_proba = min_proba
+
+    def __call__(self, pts, aspect=None):
+        proba = self.model.predict_proba(hand_features(pts, aspect or self.model.aspect))
+        i = int(proba.argmax())
+        return self.model.classes[i] if proba[i] >= self.min_proba else "none"
+
+
+def make_classifier(cfg):
+    """PoseClassifier from the "gestures" section of session_config.json,
+    or None when the rules alone decide (or the model file is missing)."""
+    if cfg.get("detector", "rules") == "rules":
+        return None
+    path = cfg.get("model_file", "gesture_model.npz")
+    if not os.path.exists(path):
+        print(f"Gesture model {path} not found — using the distance rules only")
+        return None
+    return PoseClassifier(load_classifier(path), cfg.get("min_proba", 0.6))
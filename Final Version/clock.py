@@ -0,0 +1,35 @@
+import time
+
+
+class SystemClock:
+    """Wall-clock time, as the live engine has always used."""
+
+    def now(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Time that only moves when it is told to. Replay sets it to each frame's
+    timestamp, so every cooldown, hold, debounce and filter sees the times
+    of the recording however fast the frames are pushed through, and two
+    replays of one recording produce identical events.
+    """
+
+    def __init__(self, start=0.0):
+        self.t = start
+
+    def now(self):
+        return self.t
+
+    def set(self, t):
+        self.t = t
+
+    def advance(self, seconds):
+        self.t += seconds
+
+    def sleep(self, seconds):
+        self.t += seconds
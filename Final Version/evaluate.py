@@ -0,0 +1,199 @@
+"""
+Offline gesture-accuracy evaluation over a folder of labelled recordings,
+one recording per worker process.
+
+    python evaluate.py recordings/labelled                 # all *.npz and sessions in it
+    python evaluate.py recordings/labelled --preset High --jobs 8 --out eval.json
+    python evaluate.py --synthetic 16                       # synthetic hands, for a smoke test
+
+Every recording goes through the whole recognizer (filters, smoothing,
+debounce, click/hold state machine) on a virtual clock, exactly as
+replay.py does. Inputs:
+  *.npz           landmark recordings with labels (save_landmarks) — stub detector
+  session dirs    recorder.py sessions with a labels.npy (one label per
+                  recorded frame) — real MediaPipe, so --preset matters
+Labels are "none", "left" (thumb to middle) and "right" (thumb to ring).
+
+Reported: a confusion matrix of labelled pinches against the first press
+(click or mouse-down) they produced — the "none" row counts presses with
+no pinch at all — plus false clicks per minute and detection delay from
+pinch onset to the press.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from clock import VirtualClock
+from frame_sources import (LandmarkSource, SessionSource, SyntheticHandSource, landmarks_aspect,
+                           load_landmarks, stub_factory)
+from hand_engine import CONFIDENCE_PRESETS, build_recognizer, mediapipe_hands
+from input_backends import RecordingBackend
+from recorder import session_times
+from replay import replay
+from tool_config import load_config
+
+GESTURES = ("left", "right")
+ROWS = ("none",) + GESTURES
+COLUMNS = GESTURES + ("missed",)
+
+
+def find_recordings(folder):
+    found = sorted(glob.glob(os.path.join(folder, "*.npz")))
+    found += sorted(d for d in glob.glob(os.path.join(folder, "*"))
+                    if os.path.isfile(os.path.join(d, "labels.npy")))
+    return found
+
+
+def open_recording(spec, seconds):
+    """(source, times, labels, hands_factory or None for MediaPipe)."""
+    if isinstance(spec, int):
+        size = 0.11 + 0.01 * (spec % 6)   # vary the distance to the camera
+        src = SyntheticHandSource(frames=int(seconds * 30), seed=spec, hand_size=size)
+        t, pts, labels = src.landmark_track()
+        aspect = src.aspect
+    elif spec.endswith(".npz"):
+        t, pts, labels = load_landmarks(spec)
+        if labels is None:
+            raise ValueError(f"{spec} has no labels")
+        aspect = landmarks_aspect(spec)
+    else:
+        source = SessionSource(spec)
+        labels = np.load(os.path.join(spec, "labels.npy"))
+        return source, session_times(spec), labels, None
+    source = LandmarkSource(t, pts, aspect)
+    return source, t, labels, stub_factory(source)
+
+
+def pinch_segments(t, labels):
+    """[(label, onset, end)] for every run of a pinch label."""
+    out = []
+    start = None
+    for i, label in enumerate(labels):
+        if start is not None and labels[start] != label:
+            out.append((str(labels[start]), t[start], t[i - 1]))
+            start = None
+        if start is None and label in GESTURES:
+            start = i
+    if start is not None:
+        out.append((str(labels[start]), t[start], t[-1]))
+    return out
+
+
+def score(events, segments, tolerance):
+    """Confusion counts, delays per gesture and false presses for one run."""
+    presses = [(e[0], e[4]) for e in events if e[1] == "down"]
+    matrix = np.zeros((len(ROWS), len(COLUMNS)), dtype=np.int64)
+    delays = {g: [] for g in GESTURES}
+    used = set()
+    for label, onset, end in segments:
+        first = next(((i, t, b) for i, (t, b) in enumerate(presses)
+                      if onset <= t <= end + tolerance and i not in used), None)
+        row = ROWS.index(label)
+        if first is None:
+            matrix[row, COLUMNS.index("missed")] += 1
+            continue
+        i, t, button = first
+        used.add(i)
+        matrix[row, COLUMNS.index(button)] += 1
+        if button == label:
+            delays[label].append(t - onset)
+    # presses left over: inside a pinch (repeats) or outside any (false clicks)
+    for i, (t, button) in enumerate(presses):
+        if i not in used and not any(onset <= t <= end + tolerance for _, onset, end in segments):
+            matrix[0, COLUMNS.index(button)] += 1
+    return matrix, delays
+
+
+def evaluate_one(job):
+    spec, cfg, seconds, tolerance = job
+    source, t, labels, factory = open_recording(spec, seconds)
+    cfg = json.loads(json.dumps(cfg))
+    if factory is not None:
+        cfg.setdefault("presence", {})["enabled"] = False   # blank frames
+    clock = VirtualClock()
+    backend = RecordingBackend(clock=clock)
+    recognizer = build_recognizer(cfg, None, backend, hands_factory=factory or mediapipe_hands,
+                                  clock=clock)
+    t0 = time.perf_counter()
+    replay(recognizer, source, clock)
+    matrix, delays = score(backend.events, pinch_segments(t, labels), tolerance)
+    return {
+        "recording": spec if isinstance(spec, str) else f"synthetic seed {spec}",
+        "minutes": float(t[-1] - t[0]) / 60.0 if len(t) else 0.0,
+        "seconds_taken": time.perf_counter() - t0,
+        "confusion": matrix.tolist(),
+        "delays": delays,
+    }
+
+
+def summarise(results):
+    matrix = np.sum([r["confusion"] for r in results], axis=0)
+    minutes = sum(r["minutes"] for r in results)
+    delays = {g: np.array([d for r in results for d in r["delays"][g]]) for g in GESTURES}
+    out = {"recordings": len(results), "minutes": minutes, "confusion": matrix.tolist(),
+           "false_clicks_per_min": float(matrix[0, :len(GESTURES)].sum() / minutes) if minutes else None,
+           "gestures": {}}
+    for g in GESTURES:
+        row = matrix[ROWS.index(g)]
+        d = 1000.0 * delays[g]
+        out["gestures"][g] = {
+            "pinches": int(row.sum()),
+            "recall": float(row[COLUMNS.index(g)] / row.sum()) if row.sum() else None,
+            "precision": float(matrix[ROWS.index(g), COLUMNS.index(g)] / matrix[:, COLUMNS.index(g)].sum())
+            if matrix[:, COLUMNS.index(g)].sum() else None,
+            "delay_ms": {"mean": float(d.mean()), "p50": float(np.percentile(d, 50)),
+                         "p95": float(np.percentile(d, 95))} if d.size else None,
+        }
+    return out
+
+
+def print_summary(s):
+    print(f"{s['recordings']} recordings, {s['minutes']:.1f} min")
+    print(f"{'pinch / press':<14}" + "".join(f"{c:>9}" for c in COLUMNS))
+    for r, row in zip(ROWS, s["confusion"]):
+        print(f"{r:<14}" + "".join(f"{v:>9}" for v in row))
+    print(f"false clicks {s['false_clicks_per_min']:.2f} / min")
+    for g, x in s["gestures"].items():
+        d = x["delay_ms"]
+        delay = f"delay mean {d['mean']:.0f}  p50 {d['p50']:.0f}  p95 {d['p95']:.0f} ms" if d else "no delay"
+        print(f"{g:<6} recall {x['recall'] or 0:.3f}  precision {x['precision'] or 0:.3f}  {delay}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline gesture accuracy over labelled recordings")
+    ap.add_argument("folder", nargs="?", help="folder of *.npz landmark recordings / labelled sessions")
+    ap.add_argument("--synthetic", type=int, default=0, help="evaluate N synthetic recordings instead")
+    ap.add_argument("--seconds", type=float, default=120.0, help="length of each synthetic recording")
+    ap.add_argument("--config", default="session_config.json")
+    ap.add_argument("--preset", choices=tuple(CONFIDENCE_PRESETS), help="override gesture_recognition")
+    ap.add_argument("--tolerance", type=float, default=0.3, help="s after a pinch a press still counts")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count())
+    ap.add_argument("--out", help="save per-recording and overall results as JSON")
+    args = ap.parse_args()
+
+    specs = list(range(args.synthetic)) if args.synthetic else find_recordings(args.folder or ".")
+    if not specs:
+        raise SystemExit("no labelled recordings found")
+    cfg = load_config(args.config, pinned=True)
+    if args.preset:
+        cfg["gesture_recognition"] = args.preset
+
+    t0 = time.perf_counter()
+    jobs = [(spec, cfg, args.seconds, args.tolerance) for spec in specs]
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(evaluate_one, jobs))
+    s = summarise(results)
+    print_summary(s)
+    print(f"{time.perf_counter() - t0:.1f} s with {args.jobs} workers")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"summary": s, "recordings": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+import math
+import time
+from collections import namedtuple
+from threading import Thread
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from recorder import read_session
+
+Landmark = namedtuple("Landmark", "x y z")
+
+# Open right hand, wrist at the origin, y pointing down, in units of the
+# wrist → middle-finger-MCP distance. Index order is MediaPipe's.
+HAND_TEMPLATE = np.array([
+    (0.00,  0.00),
+    (-0.35, -0.20), (-0.60, -0.40), (-0.80, -0.60), (-0.95, -0.80),   # thumb
+    (-0.30, -0.95), (-0.33, -1.35), (-0.35, -1.60), (-0.37, -1.85),   # index
+    (-0.05, -1.00), (-0.05, -1.45), (-0.05, -1.72), (-0.05, -1.98),   # middle
+    (0.20, -0.95),  (0.22, -1.35),  (0.24, -1.60),  (0.25, -1.82),    # ring
+    (0.42, -0.85),  (0.48, -1.15),  (0.52, -1.35),  (0.55, -1.52),    # pinky
+])
+
+BONES = [(0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6), (6, 7), (7, 8),
+         (5, 9), (9, 10), (10, 11), (11, 12), (9, 13), (13, 14), (14, 15),
+         (15, 16), (13, 17), (0, 17), (17, 18), (18, 19), (19, 20)]
+
+PINCH_TIPS = {"left": 12, "right": 16}
+
+# The pinching finger curls down to meet the thumb over the palm (PIP, DIP,
+# tip in HAND_TEMPLATE units), which keeps the thumb well clear of the
+# other pinch finger's tip — an extended middle tip is only ~0.035 from
+# the ring tip, close enough to fire the wrong button.
+CURLED = {
+    12: ((-0.05, -1.30), (-0.08, -0.95), (-0.10, -0.62)),
+    16: ((0.22, -1.25), (0.18, -0.92), (0.12, -0.60)),
+}
+# the other pinch distance must stay above this (normalised units), well
+# over the largest threshold tune.py sweeps
+MIN_OTHER_PINCH = 0.09
+
+
+class SyntheticHandSource:
+    """
+    Deterministic camera frames of a drawn hand moving on a Lissajous path.
+    The drawing is a stick figure for the stub detector, the overlay and
+    the frame-based gates; MediaPipe will not detect it, so real detector
+    runs need a video file or a recorded session.
+
+    Iterating yields (t, frame, hands) where frame is the BGR image as the
+    camera would deliver it (not mirrored) and hands is a list of (21, 3)
+    landmark arrays in the mirrored coordinates MediaPipe reports after
+    the engine's flip. `labels[i]` is the gesture held in frame i:
+    "none", "left" (thumb to middle) or "right" (thumb to ring). Pinches
+    alternate left / right every `pinch_every` seconds and every third one
+    is a long hold.
+    """
+
+    def __init__(self, frames=600, fps=30.0, width=1280, height=720, seed=0,
+                 hand_size=0.15, jitter=0.002, pinch_every=2.0, pinch_len=0.25,
+                 hold_len=1.0):
+        self.frames = frames
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.hand_size = hand_size
+        self.jitter = jitter
+        self.pinch_every = pinch_every
+        self.pinch_len = pinch_len
+        self.hold_len = hold_len
+        for label, other in (("left", "right"), ("right", "left")):
+            pts = self.pose(label)
+            if math.dist(pts[4, :2], pts[PINCH_TIPS[other], :2]) <= MIN_OTHER_PINCH:
+                raise ValueError(f"hand_size {hand_size} too small: a {label} pinch "
+                                 f"would also close the {other} one")
+        self.labels = [self.label_at(i / fps) for i in range(frames)]
+        self.current = []
+
+    def __len__(self):
+        return self.frames
+
+    def label_at(self, t):
+        k = int(t // self.pinch_every)
+        if k == 0:
+            return "none"
+        length = self.hold_len if k % 3 == 0 else self.pinch_len
+        if t - k * self.pinch_every >= length:
+            return "none"
+        return "left" if k % 2 else "right"
+
+    def path(self, t):
+        # index fingertip target, mirrored normalised coordinates
+        # also takes an array of times (ground truth for latency.py)
+        return (0.5 + 0.25 * np.sin(2 * math.pi * 0.23 * t),
+                0.45 + 0.15 * np.sin(2 * math.pi * 0.31 * t + 0.7))
+
+    def pose(self, label):
+        """Hand shape for a label, at the template's position, no jitter."""
+        sy = self.hand_size
+        sx = sy * self.height / self.width
+        pts = np.zeros((21, 3))
+        pts[:, 0] = HAND_TEMPLATE[:, 0] * sx
+        pts[:, 1] = HAND_TEMPLATE[:, 1] * sy
+        if label in PINCH_TIPS:
+            tip = PINCH_TIPS[label]
+            for i, xy in zip((tip - 2, tip - 1, tip), CURLED[tip]):
+                pts[i, :2] = pts[0, :2] + np.multiply(xy, (sx, sy))   # wrist is the origin
+            pts[4, :2] = pts[tip, :2] + (0.004, 0.004)
+        return pts
+
+    def landmarks(self, t, label, rng):
+        pts = self.pose(label)
+        tip_x, tip_y = self.path(t)
+        pts[:, 0] += tip_x - pts[8, 0]
+        pts[:, 1] += tip_y - pts[8, 1]
+        if self.jitter:
+            pts[:, :2] += rng.normal(0.0, self.jitter, (21, 2))
+        return pts
+
+    def draw(self, pts):
+        frame = np.full((self.height, self.width, 3), 70, dtype=np.uint8)
+        # back to the unmirrored camera image
+        px = ((1.0 - pts[:, 0]) * self.width).astype(int)
+        py = (pts[:, 1] * self.height).astype(int)
+        for a, b in BONES:
+            cv2.line(frame, (px[a], py[a]), (px[b], py[b]), (120, 150, 200), 18)
+        return frame
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed)
+        for i in range(self.frames):
+            t = i / self.fps
+            pts = self.landmarks(t, self.labels[i], rng)
+            self.current = [pts]
+            yield t, self.draw(pts), self.current
+
+    @property
+    def aspect(self):
+        return self.width / self.height
+
+    def landmark_track(self):
+        """The same landmarks without drawing frames: (t (N,), pts (N, 21, 3), labels)."""
+        rng = np.random.default_rng(self.seed)
+        t = np.arange(self.frames) / self.fps
+        pts = np.stack([self.landmarks(t[i], self.labels[i], rng) for i in range(self.frames)])
+        return t, pts, np.array(self.labels)
+
+
+def save_landmarks(path, t, pts, labels=None, aspect=None):
+    """Landmark recording: t (N,), landmarks (N, 21, 3), optional labels
+    (N,) and the camera frame's width / height (landmarks are normalised
+    per axis, so shapes need it)."""
+    arrays = {"t": np.asarray(t, dtype=np.float64), "landmarks": np.asarray(pts, dtype=np.float32)}
+    if labels is not None:
+        arrays["labels"] = np.asarray(labels, dtype=str)
+    if aspect is not None:
+        arrays["aspect"] = np.float64(aspect)
+    np.savez_compressed(path, **arrays)
+
+
+def load_landmarks(path):
+    data = np.load(path)
+    labels = data["labels"] if "labels" in data.files else None
+    return data["t"], data["landmarks"].astype(np.float64), labels
+
+
+def landmarks_aspect(path, default=16 / 9):
+    """Frame width / height a landmark recording was made at; recordings
+    from before it was stored are taken as 720p."""
+    with np.load(path) as data:
+        return float(data["aspect"]) if "aspect" in data.files else default
+
+
+class LandmarkSource:
+    """
+    Replays landmark arrays (e.g. from load_landmarks) for the stub
+    detector: yields (t, blank frame, hands) with one hand per step, or
+    none where the row is NaN. The blank frame has the recording's aspect,
+    which the recognizer reads off its shape.
+    """
+
+    def __init__(self, t, pts, aspect=16 / 9, width=64):
+        self.t = np.asarray(t, dtype=np.float64)
+        self.pts = np.asarray(pts, dtype=np.float64)
+        self.frame = np.zeros((round(width / aspect), width, 3), dtype=np.uint8)
+        self.current = []
+
+    def __len__(self):
+        return len(self.t)
+
+    def __iter__(self):
+        for t, pts in zip(self.t, self.pts):
+            self.current = [] if np.isnan(pts[0, 0]) else [pts]
+            yield float(t), self.frame, self.current
+
+
+class VideoFileSource:
+    """Frames of a recorded video; no landmarks, so use the real detector."""
+
+    def __init__(self, path, frames=None):
+        self.path = path
+        self.frames = frames
+        self.current = []
+
+    def __iter__(self):
+        cap = cv2.VideoCapture(self.path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        i = 0
+        while self.frames is None or i < self.frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield i / fps, frame, None
+            i += 1
+        cap.release()
+
+
+class PacedStream:
+    """
+    Plays a frame source at its own frame rate on a "capture" thread, with
+    the WebcamStream interface (read_seq, decode_interval, profiler), so the
+    recognizer's threaded loop runs as it would on a camera. published[seq]
+    is the perf_counter time frame seq became readable and hands[seq] its
+    landmarks. decode_interval is accepted but ignored — every frame is
+    published. on_frame(seq), if set, is called as each frame is.
+    """
+
+    def __init__(self, source, profiler=None):
+        self.source = source
+        self.profiler = profiler
+        self.seq = 0
+        self.latest = (0, None)
+        self.hands = {}
+        self.published = {}
+        self.decode_interval = 0.0
+        self.start_time = None
+        self.stopped = False
+        self.finished = False
+        self.on_frame = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        Thread(target=self.update, name="capture", daemon=True).start()
+        return self
+
+    def update(self):
+        for seq, (t, frame, hands) in enumerate(self.source, 1):
+            if self.stopped:
+                break
+            delay = self.start_time + t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.hands[seq] = hands
+            self.published[seq] = time.perf_counter()
+            self.seq = seq
+            self.latest = (seq, frame)
+            on_frame = self.on_frame
+            if on_frame is not None:
+                on_frame(seq)
+        self.finished = True
+
+    def read(self):
+        return self.latest[1]
+
+    def read_seq(self):
+        return self.latest
+
+    def stop(self):
+        self.stopped = True
+
+
+class SessionSource:
+    """Frames of a session recorded by recorder.SessionRecorder; no
+    landmarks, so use the real detector."""
+
+    def __init__(self, path, frames=None):
+        self.path = path
+        self.frames = frames
+        self.current = []
+
+    def __iter__(self):
+        for i, (t, _, frame) in enumerate(read_session(self.path)):
+            if self.frames is not None and i >= self.frames:
+                break
+            yield t, frame, None
+
+
+class StubHands:
+    """
+    Stand-in for mediapipe Hands.process(): returns the source's current
+    landmarks wrapped like MediaPipe results, after an optional fake
+    inference delay.
+    """
+
+    def __init__(self, source, max_hands=2, delay=0.0):
+        self.source = source
+        self.max_hands = max_hands
+        self.delay = delay
+
+    def process(self, rgb):
+        # landmarks of the frame passed in, not of whatever arrives meanwhile
+        current = self.source.current[:self.max_hands]
+        if self.delay:
+            time.sleep(self.delay)
+        hands = [SimpleNamespace(landmark=[Landmark(*p) for p in pts])
+                 for pts in current]
+        return SimpleNamespace(multi_hand_landmarks=hands or None)
+
+
+def stub_factory(source, delay=0.0):
+    """hands_factory for HandGestureRecognizer that builds StubHands."""
+    def factory(complexity, max_hands, detection_conf, tracking_conf):
+        return StubHands(source, max_hands, delay)
+    return factory
@@ -0,0 +1,280 @@
+import time
+
+import cv2
+
+ACTIVE = "active"
+IDLE   = "idle"
+SLEEP  = "sleep"
+
+
+class MotionTrigger:
+    """
+    Frame-difference on a tiny grayscale thumbnail. Costs a nearest-neighbour
+    resize of a few hundred pixels, so it can run on every frame that the
+    governor would otherwise skip.
+    """
+
+    def __init__(self, threshold=8.0, size=(32, 18)):
+        self.threshold = threshold
+        self.size = size
+        self.prev = None
+
+    def diff(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_NEAREST)
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        prev, self.prev = self.prev, small
+        if prev is None:
+            return None
+        return cv2.absdiff(small, prev)
+
+    def __call__(self, frame):
+        d = self.diff(frame)
+        return d is not None and d.mean() > self.threshold
+
+
+class PowerGovernor:
+    """
+    active → idle → sleep as the time without a detected hand grows.
+    Lower states process fewer frames, decode fewer camera frames and
+    repaint the overlay less often. A detection, or motion seen by the
+    trigger, gets the frame processed immediately; a detection jumps
+    straight back to active.
+    """
+
+    def __init__(self, idle_after=5.0, sleep_after=30.0,
+                 idle_fps=10.0, sleep_fps=3.0,
+                 overlay_ms=None, motion_threshold=8.0):
+        self.idle_after = idle_after
+        self.sleep_after = sleep_after
+        self.frame_interval = {ACTIVE: 0.0, IDLE: 1.0 / idle_fps, SLEEP: 1.0 / sleep_fps}
+        self.overlay_ms = overlay_ms or {ACTIVE: 5, IDLE: 100, SLEEP: 500}
+        self.motion = MotionTrigger(motion_threshold) if motion_threshold else None
+
+        self.state = ACTIVE
+        self.last_seen = None
+        self.next_due = 0.0
+        self.wakeups = 0
+        self.motion_hits = 0
+
+    def should_process(self, frame, now):
+        if now >= self.next_due:
+            return True
+        if self.state == ACTIVE:
+            return False
+        if self.motion is not None and self.motion(frame):
+            self.motion_hits += 1
+            return True
+        return False
+
+    def update(self, now, hand_present):
+        if self.last_seen is None:
+            self.last_seen = now
+        if hand_present:
+            self.last_seen = now
+            if self.state != ACTIVE:
+                self.wake(now)
+        else:
+            quiet = now - self.last_seen
+            state = self.state
+            if quiet >= self.sleep_after:
+                state = SLEEP
+            elif quiet >= self.idle_after:
+                state = IDLE
+            if state != self.state and self.state == ACTIVE and self.motion is not None:
+                # thumbnail from before the hand left is no use as a reference
+                self.motion.prev = None
+            self.state = state
+        self.next_due = now + self.frame_interval[self.state]
+        return self.state
+
+    def wake(self, now):
+        if self.state != ACTIVE:
+            self.wakeups += 1
+        self.state = ACTIVE
+        self.last_seen = now
+        self.next_due = now
+
+    def capture_interval(self):
+        # The camera keeps grabbing so its buffer stays fresh, but frames
+        # are only decoded this often. Motion checks still get frames at
+        # twice the processing rate.
+        return self.frame_interval[self.state] / 2
+
+    def overlay_interval_ms(self):
+        return self.overlay_ms[self.state]
+
+
+# (inference width, model complexity, max inference fps, overlay ms)
+# Level 0 is full quality; every step down is cheaper than the one above.
+QUALITY_LEVELS = [
+    (None, 1, 0,  5),
+    (960,  1, 0,  15),
+    (640,  1, 30, 33),
+    (640,  0, 30, 33),
+    (480,  0, 20, 66),
+    (320,  0, 10, 100),
+]
+
+
+class BudgetGovernor:
+    """
+    Steps between QUALITY_LEVELS to keep the engine inside a CPU budget
+    (percent of one core, all threads) or a per-frame pipeline budget in ms.
+
+    Measurements are averaged over `window` seconds. A step down needs
+    `hold` windows in a row over budget, a step up needs `hold` windows
+    under headroom * budget — the gap between the two keeps levels from
+    flapping. A level that already had to be abandoned is retried only
+    after exponentially more quiet windows.
+    """
+
+    def __init__(self, cpu_percent=None, frame_ms=None, level=0,
+                 window=1.0, hold=2, headroom=0.7):
+        self.cpu_percent = cpu_percent
+        self.frame_ms = frame_ms
+        self.level = level
+        self.window = window
+        self.hold = hold
+        self.headroom = headroom
+
+        self.window_start = None
+        self.cpu_start = None
+        self.frame_total = 0.0
+        self.frame_count = 0
+        self.over = 0
+        self.under = 0
+        self.strikes = {}
+        self.last_measure = None
+
+    @property
+    def enabled(self):
+        return bool(self.cpu_percent or self.frame_ms)
+
+    @property
+    def settings(self):
+        return QUALITY_LEVELS[self.level]
+
+    def record(self, frame_seconds):
+        self.frame_total += frame_seconds
+        self.frame_count += 1
+
+    def measure(self, now):
+        if self.cpu_percent:
+            used = time.process_time() - self.cpu_start
+            return 100.0 * used / (now - self.window_start), self.cpu_percent
+        if self.frame_count == 0:
+            return None, self.frame_ms
+        return 1000.0 * self.frame_total / self.frame_count, self.frame_ms
+
+    def tick(self, now):
+        """Call once per processed frame; True when the level changed."""
+        if not self.enabled:
+            return False
+        if self.window_start is None:
+            self.window_start, self.cpu_start = now, time.process_time()
+            return False
+        if now - self.window_start < self.window:
+            return False
+
+        value, budget = self.measure(now)
+        self.last_measure = value
+        self.window_start, self.cpu_start = now, time.process_time()
+        self.frame_total, self.frame_count = 0.0, 0
+        if value is None:
+            return False
+
+        if value > budget:
+            self.over, self.under = self.over + 1, 0
+        elif value < budget * self.headroom:
+            self.over, self.under = 0, self.under + 1
+        else:
+            self.over = self.under = 0
+
+        if self.over >= self.hold and self.level < len(QUALITY_LEVELS) - 1:
+            self.strikes[self.level] = self.strikes.get(self.level, 0) + 1
+            self.level += 1
+        elif self.level > 0 and \
+                self.under >= self.hold * 2 ** self.strikes.get(self.level - 1, 0):
+            self.level -= 1
+        else:
+            return False
+        self.over = self.under = 0
+        return True
+
+
+class HandCountGovernor:
+    """
+    Decides max_num_hands per frame. Tracking runs single-hand; the
+    two-hand model is used only for a periodic probe, when the half of the
+    frame away from the tracked hand shows motion, and for `timeout`
+    seconds after two hands were last seen.
+    """
+
+    def __init__(self, enabled=True, probe_interval=1.0, timeout=2.0,
+                 pixel_threshold=25, area=0.03):
+        self.enabled = enabled
+        self.probe_interval = probe_interval
+        self.timeout = timeout
+        self.pixel_threshold = pixel_threshold
+        self.area = area
+        self.motion = MotionTrigger()
+
+        self.two_until = 0.0
+        self.next_probe = 0.0
+        self.probes = 0
+        self.cues = 0
+
+    def max_hands(self, frame, now, hand_x):
+        if not self.enabled:
+            return 2
+        # keep the thumbnail current even when the answer is already known
+        d = self.motion.diff(frame)
+        if now < self.two_until:
+            return 2
+        if now >= self.next_probe:
+            self.next_probe = now + self.probe_interval
+            self.probes += 1
+            return 2
+        if d is not None and hand_x is not None:
+            half = d.shape[1] // 2
+            other = d[:, half:] if hand_x < 0.5 else d[:, :half]
+            if (other > self.pixel_threshold).mean() > self.area:
+                self.cues += 1
+                return 2
+        return 1
+
+    def update(self, now, n_hands):
+        if n_hands >= 2:
+            self.two_until = now + self.timeout
+
+
+def make_hand_count(cfg):
+    """Build from the "two_hands" section of session_config.json."""
+    return HandCountGovernor(
+        enabled=cfg.get("dynamic", True),
+        probe_interval=cfg.get("probe_interval_s", 1.0),
+        timeout=cfg.get("timeout_s", 2.0),
+    )
+
+
+def make_budget(cfg):
+    """Build a budget governor from the "performance" section of session_config.json."""
+    return BudgetGovernor(
+        cpu_percent=cfg.get("cpu_percent"),
+        frame_ms=cfg.get("frame_ms"),
+        level=cfg.get("start_level", 0),
+    )
+
+
+def make_governor(cfg):
+    """Build a governor from the "power" section of session_config.json."""
+    return PowerGovernor(
+        idle_after=cfg.get("idle_after_s", 5.0),
+        sleep_after=cfg.get("sleep_after_s", 30.0),
+        idle_fps=cfg.get("idle_fps", 10.0),
+        sleep_fps=cfg.get("sleep_fps", 3.0),
+        overlay_ms={ACTIVE: 5,
+                    IDLE: cfg.get("overlay_idle_ms", 100),
+                    SLEEP: cfg.get("overlay_sleep_ms", 500)},
+        motion_threshold=cfg.get("motion_threshold", 8.0),
+    )
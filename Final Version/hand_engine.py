@@ -0,0 +1,507 @@
+import math
+import time
+from threading import Thread
+
+import cv2
+import numpy as np
+
+from classifier import make_classifier
+from clock import SystemClock
+from screen_mapping import ScreenMapper
+from presence import make_presence
+from profiling import StageTimer
+from smoothing import ema_alpha, LandmarkFilter
+from governor import (ACTIVE, PowerGovernor, BudgetGovernor, HandCountGovernor,
+                      make_governor, make_budget, make_hand_count)
+
+# "Gesture Recognition" setting → MediaPipe detection / tracking confidence
+CONFIDENCE_PRESETS = {"Low": (0.3, 0.3), "Medium": (0.7, 0.7), "High": (0.9, 0.9)}
+
+
+class WebcamStream:
+    def __init__(self, src=0, width=1280, height=720, profiler=None):
+        self.profiler = profiler or StageTimer()
+        self.cap = cv2.VideoCapture(src)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.ret, self.frame = self.cap.read()
+        self.seq = 0
+        self.latest = (0, self.frame)
+        self.stopped = False
+        # set by the power governor — frames are still grabbed, but only
+        # decoded this often
+        self.decode_interval = 0.0
+        # optional recorder.SessionRecorder; offer() never blocks
+        self.recorder = None
+        # optional callback(seq) on every new frame, called on this thread
+        self.on_frame = None
+
+    def start(self):
+        Thread(target=self.update, name="capture", daemon=True).start()
+        return self
+
+    def update(self):
+        prof = self.profiler
+        last = 0.0
+        while not self.stopped:
+            t = time.perf_counter()
+            if not self.cap.grab():
+                continue
+            t = prof.lap("capture_wait", t, self.seq + 1)
+            now = time.time()
+            if now - last < self.decode_interval:
+                continue
+            self.ret, self.frame = self.cap.retrieve()
+            self.seq += 1
+            self.latest = (self.seq, self.frame)
+            prof.lap("decode", t, self.seq)
+            on_frame = self.on_frame   # cleared from the Tk thread on quit
+            if on_frame is not None:
+                on_frame(self.seq)
+            # read once: F8 may clear it from the Tk thread at any moment,
+            # and offer() refuses frames once the recorder is closed
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.offer(self.seq, now, self.frame)
+            last = now
+
+    def read(self):
+        return self.frame
+
+    def read_seq(self):
+        # (sequence number, frame) from one attribute, so they always match
+        return self.latest
+
+    def stop(self):
+        self.stopped = True
+        self.cap.release()
+
+
+def mediapipe_hands(complexity, max_hands, detection_conf, tracking_conf):
+    # imported here so benchmarks with a stub detector run without MediaPipe
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(
+        static_image_mode=False,
+        model_complexity=complexity,
+        max_num_hands=max_hands,
+        min_detection_confidence=detection_conf,
+        min_tracking_confidence=tracking_conf
+    )
+
+
+def hand_array(hand):
+    # MediaPipe landmark list → (21, 3) array of normalised x, y, z
+    return np.array([(p.x, p.y, p.z) for p in hand.landmark])
+
+
+class HandGestureRecognizer:
+    def __init__(self, stream, backend, mapper=None, governor=None, budget=None,
+                 hand_count=None, presence=None, confidence=(0.7, 0.7), profiler=None,
+                 hands_factory=mediapipe_hands, clock=None):
+        self.stream = stream
+        # every gesture / smoothing timestamp comes from here — a VirtualClock
+        # lets a recording replay faster than real time with the same result
+        self.clock = clock or SystemClock()
+        self.profiler = profiler or getattr(stream, "profiler", None) or StageTimer()
+        self.backend = backend
+        self.mapper = mapper or ScreenMapper(backend)
+        # list while the active box is being calibrated: raw index-tip
+        # (x, y) of every frame, for ScreenMapper.calibrate
+        self.calibration = None
+        self.governor = governor or PowerGovernor()
+        self.budget = budget or BudgetGovernor()
+        self.hand_count = hand_count or HandCountGovernor()
+        self.presence = presence
+        self.last_hand_x = None
+
+        # MediaPipe models by (complexity, max hands) — kept once created so
+        # stepping between quality levels does not reload the graph, and the
+        # one- and two-hand instances each keep their own tracking state
+        self.detection_conf, self.tracking_conf = confidence
+        self.hands_factory = hands_factory
+        self.models = {}
+        self.complexity = 1
+        self.infer_width = None
+        self.apply_quality()
+
+        # Lite model for plain pointing, full model while a gesture test is
+        # close to its threshold. Every model process_frame can pick (either
+        # complexity — also the budget governor's — with one or two hands)
+        # is built and warmed up front, so a switch never pays the graph
+        # start-up on the recognizer thread.
+        self.adaptive_complexity = True
+        self.ambiguity_margin = 0.3
+        self.full_hold = 0.3
+        self.full_until = 0.0
+        for c in (0, 1):
+            for n in ((1, 2) if self.hand_count.enabled else (2,)):
+                self.warm_up(self.hands_for(c, n))
+
+        # A model that sat idle resumes tracking from the region where it
+        # last saw the hand. If the hand has moved since, the first frame
+        # after a switch can come back empty; that frame is then re-run on
+        # the model that was tracking. Counted, so bench.py can show how
+        # often it happens with the real detector.
+        self.last_model = None
+        self.model_switches = 0
+        self.switch_misses = 0
+
+        # Cursor smoothing state (factor is per frame at REFERENCE_FPS)
+        self.prev_x, self.prev_y = 0, 0
+        self.prev_t = None
+        self.smooth_factor = 0.8
+        # dead zone in px — the cursor holds until a step is larger
+        self.smooth_epsilon = 0.0
+
+        # Per-hand landmark filters — gestures use the stabilised points
+        self.filters = [LandmarkFilter(), LandmarkFilter()]
+
+        # A pinch must be held this long before it counts (was 3 frames)
+        self.debounce = 0.05
+        self.hold = 0.5
+        self.pinch_threshold = 0.04
+
+        # Optional learned pose classifier (classifier.PoseClassifier).
+        # detector: "rules" (distance only), "classifier", or "both" — a
+        # pinch then needs the distance test and the classifier to agree
+        self.classifier = None
+        self.detector = "rules"
+        self.aspect = 16 / 9   # of the frame being processed
+
+        # Thread control & gesture flags
+        self.running = True
+        self.cooldown_end = 0
+        self.show_resize_flag = False
+
+        # Left-click pinch state
+        self.left_since = None
+        self.left_active = False
+        self.left_holding = False
+        self.left_start = None
+
+        # Right-click pinch state
+        self.right_since = None
+        self.right_active = False
+        self.right_holding = False
+        self.right_start = None
+
+        # Drag‑resize state
+        self.resizing = False
+        self.initial_hand_x = None
+        self.initial_win_w = None
+        self.initial_win_h = None
+
+        # (seq, filtered hands) of the last processed frame, in one attribute
+        # for the overlay thread; on_hands(seq), if set, is called after each
+        # update on this thread
+        self.latest_hands = (0, [])
+        self.on_hands = None
+
+    def start(self):
+        Thread(target=self.run, name="recognizer", daemon=True).start()
+
+    def hands_for(self, complexity, max_hands):
+        hands = self.models.get((complexity, max_hands))
+        if hands is None:
+            hands = self.hands_factory(complexity, max_hands,
+                                       self.detection_conf, self.tracking_conf)
+            self.models[(complexity, max_hands)] = hands
+        return hands
+
+    def warm_up(self, hands):
+        hands.process(np.zeros((256, 256, 3), dtype=np.uint8))
+
+    def model_complexity(self, now):
+        # the budget governor's level is the ceiling
+        if not self.adaptive_complexity or self.complexity == 0:
+            return self.complexity
+        return 1 if now < self.full_until else 0
+
+    def ambiguous(self, hands):
+        if self.left_active or self.right_active:
+            return True
+        h = hands[0]
+        band = self.pinch_threshold * self.ambiguity_margin
+        for tip in (12, 16):
+            if abs(self.norm_dist(h[tip], h[4]) - self.pinch_threshold) < band:
+                return True
+        if len(hands) >= 2:
+            for h in hands[:2]:
+                if abs(h[4, 1] - h[2, 1]) < band:
+                    return True
+        return False
+
+    def apply_quality(self):
+        width, complexity, fps, overlay_ms = self.budget.settings
+        self.complexity = complexity
+        self.infer_width = width
+        self.governor.frame_interval[ACTIVE] = 1.0 / fps if fps else 0.0
+        self.governor.overlay_ms[ACTIVE] = overlay_ms
+
+    def run(self):
+        while self.running:
+            seq, frame = self.stream.read_seq()
+            if frame is None:
+                continue
+
+            now = self.clock.now()
+            if not self.governor.should_process(frame, now):
+                time.sleep(min(max(self.governor.next_due - now, 0.0), 0.03))
+                continue
+
+            self.process_frame(seq, frame, now)
+            self.stream.decode_interval = self.governor.capture_interval()
+            time.sleep(0.01)
+
+    def process_frame(self, seq, frame, now):
+        """One pass of the pipeline on a BGR camera frame; returns the number
+        of hands found (0 also when the presence gate skipped inference)."""
+        prof = self.profiler
+        # landmarks are normalised per axis — shape tests need the aspect
+        self.aspect = frame.shape[1] / frame.shape[0]
+
+        # cheap skin + motion gate before any MediaPipe work
+        t0 = t = time.perf_counter()
+        tracking = self.last_hand_x is not None
+        if self.presence is not None and \
+                not self.presence.should_infer(frame, now, tracking):
+            prof.lap("gate", t, seq)
+            self.governor.update(now, False)
+            return 0
+        t = prof.lap("gate", t, seq)
+
+        if self.infer_width and frame.shape[1] > self.infer_width:
+            h = frame.shape[0] * self.infer_width // frame.shape[1]
+            frame = cv2.resize(frame, (self.infer_width, h), interpolation=cv2.INTER_AREA)
+            t = prof.lap("resize", t, seq)
+        frame = cv2.flip(frame, 1)
+        t = prof.lap("flip", t, seq)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        t = prof.lap("convert", t, seq)
+        max_hands = self.hand_count.max_hands(frame, now, self.last_hand_x)
+        model = (self.model_complexity(now), max_hands)
+        results = self.hands_for(*model).process(rgb)
+        if self.last_model is not None and model != self.last_model:
+            self.model_switches += 1
+            if tracking and not results.multi_hand_landmarks:
+                self.switch_misses += 1
+                results = self.hands_for(*self.last_model).process(rgb)
+        self.last_model = model
+        t = prof.lap("process", t, seq)
+        now = self.clock.now()
+
+        found = results.multi_hand_landmarks or []
+        self.governor.update(now, bool(found))
+        self.hand_count.update(now, len(found))
+        if found and not tracking and self.presence is not None:
+            self.presence.learn()
+
+        if found:
+            raw = [hand_array(h) for h in found[:2]]
+            # the two-hand model may list hands in either order — keep
+            # the one that was being tracked first so the cursor stays put
+            if len(raw) == 2 and self.last_hand_x is not None and \
+                    abs(raw[1][0, 0] - self.last_hand_x) < abs(raw[0][0, 0] - self.last_hand_x):
+                raw.reverse()
+            hands = [f(pts, now) for f, pts in zip(self.filters, raw)]
+            self.last_hand_x = raw[0][0, 0]
+            # read once: F7 may clear it from the Tk thread at any moment
+            calibration = self.calibration
+            if calibration is not None:
+                calibration.append((raw[0][8, 0], raw[0][8, 1]))
+            for f in self.filters[len(hands):]:
+                f.reset()
+            t = prof.lap("features", t, seq)
+            # move cursor (has its own smoothing, so raw tip)
+            if not self.resizing:
+                ix, iy = self.smooth_cursor(raw[0][8], now)
+                self.backend.move_to(ix, iy)
+                t = prof.lap("cursor", t, seq)
+            # detect all gestures
+            self.detect_gestures(hands, now)
+            if self.ambiguous(hands):
+                self.full_until = now + self.full_hold
+            prof.lap("gestures", t, seq)
+            self.publish_hands(seq, hands)
+        else:
+            # a move coalesced just before the hand left would otherwise
+            # wait for the next button event
+            self.backend.flush()
+            self.last_hand_x = None
+            for f in self.filters:
+                f.reset()
+            if self.latest_hands[1]:
+                self.publish_hands(seq, [])
+
+        self.budget.record(time.perf_counter() - t0)
+        if self.budget.tick(now):
+            self.apply_quality()
+        return len(found)
+
+    def publish_hands(self, seq, hands):
+        # the landmark filters update their arrays in place on the next
+        # frame — the display thread gets its own copies
+        self.latest_hands = (seq, [h.copy() for h in hands])
+        on_hands = self.on_hands   # cleared from the Tk thread on quit
+        if on_hands is not None:
+            on_hands(seq)
+
+    def gesture_state(self):
+        """What the hand is doing, for on-screen feedback."""
+        if self.resizing:
+            return "resize"
+        for button in ("left", "right"):
+            if getattr(self, button + "_holding"):
+                return button + " hold"
+            if getattr(self, button + "_active"):
+                return button + " pinch"
+        return ""
+
+    def smooth_cursor(self, tip, now):
+        x, y = self.mapper.map(tip[0], tip[1])
+        dt = now - self.prev_t if self.prev_t is not None else 0.0
+        a = ema_alpha(self.smooth_factor, dt) if dt > 0 else self.smooth_factor
+        nx = self.prev_x + (x - self.prev_x) * a
+        ny = self.prev_y + (y - self.prev_y) * a
+        if abs(nx - self.prev_x) > self.smooth_epsilon or abs(ny - self.prev_y) > self.smooth_epsilon:
+            self.prev_x, self.prev_y = nx, ny
+        self.prev_t = now
+        return self.prev_x, self.prev_y
+
+    def detect_gestures(self, hands, now):
+        # ── 1) TWO‑THUMBS‑UP → maximize/restore ─────────────────────────────
+        if len(hands) >= 2:
+            thumbs_up = True
+            for h in hands[:2]:
+                # thumb tip above thumb MCP
+                if h[4, 1] >= h[2, 1]:
+                    thumbs_up = False
+                    break
+                # other fingers folded
+                for tip, base in [(8, 6), (12, 10), (16, 14), (20, 18)]:
+                    if h[tip, 1] < h[base, 1]:
+                        thumbs_up = False
+                        break
+            if thumbs_up and now >= self.cooldown_end:
+                self.show_resize_flag = True
+                self.cooldown_end = now + 1.0
+                # reset any ongoing drag‑resize
+                self.resizing = False
+                return
+
+        # ── 2) DRAG‑RESIZE (during cooldown if started) ──────────────────────
+        if now < self.cooldown_end and self.resizing:
+            # use first hand to drag-resize
+            dx = hands[0][8, 0] - self.initial_hand_x
+            new_w = int(self.initial_win_w * (1 + dx))
+            new_h = int(self.initial_win_h * (1 + dx))
+            self.backend.resize_active_window(new_w, new_h)
+            return
+
+        pose = self.classifier(hands[0], self.aspect) if self.classifier is not None else None
+
+        # ── 3) LEFT‑CLICK PINCH ───────────────────────────────────────────────
+        d_mid = self.norm_dist(hands[0][12], hands[0][4])
+        if self.pinched(d_mid < self.pinch_threshold, pose, 'left'):
+            if self.left_since is None:
+                self.left_since = now
+            if now - self.left_since >= self.debounce:
+                if not self.left_active:
+                    self.left_active = True
+                    self.left_start = now
+                elif not self.left_holding and (now - self.left_start) > self.hold:
+                    self.backend.mouse_down('left')
+                    self.left_holding = True
+            return
+        else:
+            if self.left_active:
+                dur = now - self.left_start
+                if dur <= self.hold:
+                    self.backend.click('left')
+                elif self.left_holding:
+                    self.backend.mouse_up('left')
+                self.left_active = False
+                self.left_holding = False
+            self.left_since = None
+
+        # ── 4) RIGHT‑CLICK PINCH ──────────────────────────────────────────────
+        d_ring = self.norm_dist(hands[0][16], hands[0][4])
+        if self.pinched(d_ring < self.pinch_threshold, pose, 'right'):
+            if self.right_since is None:
+                self.right_since = now
+            if now - self.right_since >= self.debounce:
+                if not self.right_active:
+                    self.right_active = True
+                    self.right_start = now
+                elif not self.right_holding and (now - self.right_start) > self.hold:
+                    self.backend.mouse_down('right')
+                    self.right_holding = True
+            return
+        else:
+            if self.right_active:
+                dur = now - self.right_start
+                if dur <= self.hold:
+                    self.backend.click('right')
+                elif self.right_holding:
+                    self.backend.mouse_up('right')
+                self.right_active = False
+                self.right_holding = False
+            self.right_since = None
+
+    def pinched(self, rule, pose, button):
+        if pose is None:
+            return rule
+        if self.detector == "classifier":
+            return pose == button
+        return rule and pose == button
+
+    def norm_dist(self, p1, p2):
+        return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
+
+
+    def stop(self):
+        self.running = False
+
+
+def build_recognizer(cfg, stream, backend, profiler=None, hands_factory=mediapipe_hands,
+                     clock=None):
+    """HandGestureRecognizer set up from a session_config.json dict."""
+    # — Gesture-recognition → confidences —
+    confidence = CONFIDENCE_PRESETS[cfg.get("gesture_recognition", "Medium")]
+
+    # — Camera → screen mapping (active box + target monitor) —
+    map_cfg = cfg.get("mapping", {})
+    mapper = ScreenMapper(backend,
+                          map_cfg.get("active_region", (0.0, 0.0, 1.0, 1.0)),
+                          map_cfg.get("monitor", "primary"))
+
+    # — Idle power governor, CPU budget, one/two-hand model, presence gate —
+    recognizer = HandGestureRecognizer(
+        stream, backend, mapper,
+        governor=make_governor(cfg.get("power", {})),
+        budget=make_budget(cfg.get("performance", {})),
+        hand_count=make_hand_count(cfg.get("two_hands", {})),
+        presence=make_presence(cfg.get("presence", {})),
+        confidence=confidence,
+        profiler=profiler,
+        hands_factory=hands_factory,
+        clock=clock,
+    )
+
+    # — Cursor smoothing factor and dead zone —
+    smooth_cfg = cfg.get("cursor_smoothing", {})
+    recognizer.smooth_factor = smooth_cfg.get("interpolation", 80) / 100.0
+    recognizer.smooth_epsilon = smooth_cfg.get("epsilon", 0)
+
+    # — Gesture timing and landmark filter —
+    gest_cfg = cfg.get("gestures", {})
+    recognizer.debounce = gest_cfg.get("debounce_ms", 50) / 1000.0
+    recognizer.hold = gest_cfg.get("hold_s", 0.5)
+    recognizer.pinch_threshold = gest_cfg.get("pinch_threshold", 0.04)
+    recognizer.classifier = make_classifier(gest_cfg)
+    recognizer.detector = gest_cfg.get("detector", "rules")
+    recognizer.adaptive_complexity = cfg.get("performance", {}).get("adaptive_complexity", True)
+    for f in recognizer.filters:
+        f.min_cutoff = gest_cfg.get("landmark_min_cutoff", f.min_cutoff)
+        f.beta = gest_cfg.get("landmark_beta", f.beta)
+    return recognizer
@@ -0,0 +1,214 @@
+import math
+import time
+
+
+class InputBackend:
+    """
+    Base class for cursor / click output.
+
+    Subclasses implement _move() and _button(). Moves closer than
+    min_move_px to the last delivered position are dropped, and moves
+    arriving faster than max_rate_hz are coalesced: only the newest one is
+    kept and it is flushed before the next button event, so clicks always
+    land where the cursor was last asked to be. Rate limiting runs on
+    perf_counter unless a clock (clock.VirtualClock for replay) is set.
+    """
+
+    def __init__(self, min_move_px=1.0, max_rate_hz=0, clock=None):
+        self.min_move_px = min_move_px
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz else 0.0
+        self.clock = clock
+
+        self.last_x, self.last_y = None, None
+        self.last_move_t = -math.inf
+        self.pending = None
+
+        self.moves_sent = 0
+        self.moves_dropped = 0
+
+    # ── cursor ───────────────────────────────────────────────────────────
+    def move_to(self, x, y):
+        x, y = int(x), int(y)
+        if self.last_x is not None and \
+                math.hypot(x - self.last_x, y - self.last_y) < self.min_move_px:
+            self.pending = None
+            self.moves_dropped += 1
+            return False
+
+        now = self.now()
+        if now - self.last_move_t < self.min_interval:
+            self.pending = (x, y)
+            self.moves_dropped += 1
+            return False
+
+        self._deliver(x, y, now)
+        return True
+
+    def flush(self):
+        if self.pending is not None:
+            self._deliver(*self.pending, self.now())
+
+    def now(self):
+        return self.clock.now() if self.clock is not None else time.perf_counter()
+
+    def _deliver(self, x, y, now):
+        self._move(x, y)
+        self.last_x, self.last_y = x, y
+        self.last_move_t = now
+        self.pending = None
+        self.moves_sent += 1
+
+    # ── buttons ──────────────────────────────────────────────────────────
+    def mouse_down(self, button='left'):
+        self.flush()
+        self._button(button, True)
+
+    def mouse_up(self, button='left'):
+        self.flush()
+        self._button(button, False)
+
+    def click(self, button='left'):
+        self.flush()
+        self._button(button, True)
+        self._button(button, False)
+
+    # ── windows ──────────────────────────────────────────────────────────
+    def resize_active_window(self, width, height):
+        pass
+
+    # ── to override ──────────────────────────────────────────────────────
+    def size(self):
+        raise NotImplementedError
+
+    def _move(self, x, y):
+        raise NotImplementedError
+
+    def _button(self, button, down):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiBackend(InputBackend):
+    def __init__(self, min_move_px=1.0, max_rate_hz=0):
+        super().__init__(min_move_px, max_rate_hz)
+        import pyautogui as pg
+        pg.FAILSAFE = True
+        pg.PAUSE = 0
+        self.pg = pg
+
+    def size(self):
+        return tuple(self.pg.size())
+
+    def _move(self, x, y):
+        self.pg.moveTo(x, y)
+
+    def _button(self, button, down):
+        if down:
+            self.pg.mouseDown(button=button)
+        else:
+            self.pg.mouseUp(button=button)
+
+    def click(self, button='left'):
+        # one call instead of two — pyautogui sends both events in one go
+        self.flush()
+        self.pg.click(button=button)
+
+    def resize_active_window(self, width, height):
+        import win32gui
+        import win32con
+        hwnd = win32gui.GetForegroundWindow()
+        if not hwnd:
+            return
+        left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+        win32gui.SetWindowPos(
+            hwnd, None,
+            left, top,
+            width, height,
+            win32con.SWP_NOZORDER | win32con.SWP_NOOWNERZORDER
+        )
+
+
+class XTestBackend(InputBackend):
+    """
+    Native X11 output through the XTest extension (python-xlib).
+    Skips pyautogui's per-call platform checks and screenshot fail-safe.
+    """
+
+    BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+
+    def __init__(self, min_move_px=1.0, max_rate_hz=0, display_name=None):
+        super().__init__(min_move_px, max_rate_hz)
+        from Xlib import X, display
+        from Xlib.ext import xtest
+        self.X = X
+        self.xtest = xtest
+        self.display = display.Display(display_name)
+        if not self.display.has_extension('XTEST'):
+            raise RuntimeError("X server has no XTEST extension")
+        screen = self.display.screen()
+        self.screen_size = (screen.width_in_pixels, screen.height_in_pixels)
+
+    def size(self):
+        return self.screen_size
+
+    def _move(self, x, y):
+        self.xtest.fake_input(self.display, self.X.MotionNotify, x=x, y=y)
+        self.display.flush()
+
+    def _button(self, button, down):
+        event = self.X.ButtonPress if down else self.X.ButtonRelease
+        self.xtest.fake_input(self.display, event, self.BUTTONS[button])
+        self.display.flush()
+
+    def close(self):
+        self.display.close()
+
+
+class RecordingBackend(InputBackend):
+    """
+    In-memory backend for tests and benchmarks. Every delivered event is
+    stored as (timestamp, kind, x, y, button) — no display needed.
+    """
+
+    def __init__(self, min_move_px=1.0, max_rate_hz=0, screen_size=(1920, 1080), clock=None):
+        super().__init__(min_move_px, max_rate_hz, clock)
+        self.screen_size = tuple(screen_size)
+        self.events = []
+
+    def size(self):
+        return self.screen_size
+
+    def _move(self, x, y):
+        self.events.append((self.now(), 'move', x, y, None))
+
+    def _button(self, button, down):
+        self.events.append((self.now(), 'down' if down else 'up',
+                            self.last_x, self.last_y, button))
+
+    def resize_active_window(self, width, height):
+        self.events.append((self.now(), 'resize', width, height, None))
+
+    def moves(self):
+        return [(t, x, y) for t, kind, x, y, _ in self.events if kind == 'move']
+
+    def clear(self):
+        self.events.clear()
+        self.moves_sent = self.moves_dropped = 0
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGuiBackend,
+    "xtest": XTestBackend,
+    "recording": RecordingBackend,
+}
+
+
+def make_backend(cfg):
+    """Build a backend from the "input" section of session_config.json."""
+    name = cfg.get("backend", "pyautogui")
+    return BACKENDS[name](
+        min_move_px=cfg.get("min_move_px", 1.0),
+        max_rate_hz=cfg.get("max_rate_hz", 0),
+    )
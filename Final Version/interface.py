@@ -16,6 +16,13 @@ from PyQt5.QtCore import Qt, QPointF, QTimer
 ENGINE_SCRIPT = "tydz_VII_inżynieria.py"
 CONFIG_FILE   = "session_config.json"
 
+def load_config():
+    try:
+        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
 # Helper to create gear shapes
 def gear_with_hole_path(center: QPointF,
                         radius: float,
@@ -173,6 +180,11 @@ class MainWindow(QMainWindow):
         self.cursor_widget = QWidget(); cwl = QVBoxLayout(self.cursor_widget); cwl.setContentsMargins(0,0,0,0)
         cwl.addWidget(eps_w); cwl.addWidget(int_w)
 
+        # Start from the saved smoothing (tuned by smoothing_score.py --write-defaults)
+        saved = load_config().get("cursor_smoothing", {})
+        self.epsilon_slider.setValue(saved.get("epsilon", 0))
+        self.interp_slider.setValue(saved.get("interpolation", 80))
+
         for w in (self.cam_combo, mw, self.gesture_combo, self.cursor_widget):
             pl.addWidget(w); w.setVisible(False)
 
@@ -221,8 +233,9 @@ class MainWindow(QMainWindow):
         # Jeśli już działa, nic nie robimy
         if self.session_proc and self.session_proc.poll() is None:
             return
-        # Zbieramy ustawienia
-        cfg = {
+        # Zbieramy ustawienia — klucze bez kontrolek w UI (np. "input") zostają z pliku
+        cfg = load_config()
+        cfg.update({
             "camera_resolution": self.cam_combo.currentText(),
             "mirror_transparency": self.mirror_slider.value(),
             "gesture_recognition": self.gesture_combo.currentText(),
@@ -230,7 +243,7 @@ class MainWindow(QMainWindow):
                 "epsilon": self.epsilon_slider.value(),
                 "interpolation": self.interp_slider.value()
             }
-        }
+        })
         # Zapis do JSON
         with open(CONFIG_FILE, "w", encoding="utf-8") as f:
             json.dump(cfg, f, indent=2)
@@ -0,0 +1,220 @@
+"""
+End-to-end motion-to-cursor latency, measured headless. A synthetic hand
+follows a known path and is played in real time through the threaded
+engine (capture thread → recognizer thread → RecordingBackend); the
+recorded cursor trajectory is then aligned with the true hand path mapped
+to the screen by searching the delay that makes them match best.
+
+    python latency.py                                  # 20 s, stub detector
+    python latency.py --stub-ms 12 --overlay offscreen --out results/lat.json
+
+The detector is always the stub: the true hand path only exists for the
+synthetic hand, and its stick drawing is not something MediaPipe would
+detect. --stub-ms stands in for the inference time (see bench.py with a
+recorded session for real MediaPipe timings).
+
+Two numbers come out:
+  motion lag     — delay that best aligns the cursor with the real motion,
+                   i.e. what a presenter feels: pipeline + smoothing lag.
+                   Reported for the whole run and per sliding window.
+  pipeline       — frame published → cursor event for every processed
+                   frame, without the smoothing part.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from frame_sources import PacedStream, SyntheticHandSource, stub_factory
+from hand_engine import build_recognizer
+from input_backends import RecordingBackend
+from overlay import OverlayRenderer, RepaintGate
+from profiling import StageTimer
+from tool_config import load_config, parse_size
+
+
+def traced(recognizer, stream, replay, pipeline):
+    """Wrap process_frame to note publish → cursor-event delays per frame."""
+    process = recognizer.process_frame
+    events = recognizer.backend.events
+    seen = set()
+
+    def process_frame(seq, frame, now):
+        # the stub detector replays replay.current — the landmarks of the
+        # frame being processed (the source itself is already a frame ahead)
+        replay.current = stream.hands.get(seq, [])
+        n = len(events)
+        found = process(seq, frame, now)
+        # the loop may process a frame again before the next one arrives;
+        # only the first cursor event per frame counts
+        if seq not in seen:
+            for e in events[n:]:
+                if e[1] == 'move':
+                    pipeline.append(e[0] - stream.published[seq])
+                    seen.add(seq)
+                    break
+        return found
+
+    recognizer.process_frame = process_frame
+
+
+def truth_on_screen(source, mapper, t):
+    # same clamp as ScreenMapper.map, over an array of source times
+    sx, ox, minx, maxx, sy, oy, miny, maxy = mapper.coeffs
+    nx, ny = source.path(t)
+    return np.stack([np.clip(nx * sx + ox, minx, maxx),
+                     np.clip(ny * sy + oy, miny, maxy)], axis=-1)
+
+
+def cursor_on_grid(moves, grid):
+    """The cursor as the screen shows it: each position held until the next."""
+    mt = np.array([m[0] for m in moves])
+    xy = np.array([(m[1], m[2]) for m in moves])
+    i = np.searchsorted(mt, grid, side="right") - 1
+    ok = i >= 0
+    return xy[i[ok]], ok
+
+
+def best_lag(cursor, truth_fn, grid, lags):
+    """Lag at which the delayed true path best matches the cursor (least
+    squares over x and y), the RMS error there and the normalised
+    cross-correlation of the mean-removed trajectories at that lag."""
+    truth = truth_fn(grid[None, :] - lags[:, None])            # (L, n, 2)
+    mse = ((cursor - truth) ** 2).sum(axis=2).mean(axis=1)
+    k = int(np.argmin(mse))
+    a = cursor - cursor.mean(axis=0)
+    b = truth[k] - truth[k].mean(axis=0)
+    ncc = (a * b).sum() / np.sqrt((a * a).sum() * (b * b).sum())
+    return float(lags[k]), float(ncc), float(np.sqrt(mse[k]))
+
+
+def motion_lag(moves, truth_fn, t_start, t_end, step, max_lag, window):
+    grid = np.arange(t_start, t_end, step)
+    lags = np.arange(0.0, max_lag + step / 2, step)
+    cursor, ok = cursor_on_grid(moves, grid)
+    grid = grid[ok]
+    lag, ncc, rms = best_lag(cursor, truth_fn, grid, lags)
+
+    per_window = []
+    n = int(window / step)
+    for i in range(0, len(grid) - n + 1, n // 2):
+        per_window.append(best_lag(cursor[i:i + n], truth_fn, grid[i:i + n], lags)[0])
+    return lag, ncc, rms, per_window
+
+
+def distribution(values_s):
+    if not len(values_s):
+        return None
+    v = 1000.0 * np.asarray(values_s)
+    return {"count": int(v.size), "mean_ms": float(v.mean()),
+            **{f"p{q}_ms": float(np.percentile(v, q)) for q in (5, 50, 95, 99)},
+            "max_ms": float(v.max())}
+
+
+def measure(args):
+    cfg = load_config(args.config, pinned=True)
+
+    source = SyntheticHandSource(frames=int(args.seconds * args.fps), fps=args.fps,
+                                 width=args.width, height=args.height, seed=args.seed)
+    profiler = StageTimer(enabled=True)
+    stream = PacedStream(source, profiler)
+    backend = RecordingBackend(screen_size=args.screen)
+    replay = SimpleNamespace(current=[])
+    factory = stub_factory(replay, args.stub_ms / 1000.0)
+    recognizer = build_recognizer(cfg, stream, backend, profiler, factory)
+    pipeline = []
+    traced(recognizer, stream, replay, pipeline)
+    renderer = OverlayRenderer(args.screen) if args.overlay == "offscreen" else None
+
+    # main thread stands in for the Tk overlay: polls for a frame the
+    # capture thread has published, one repaint per new frame at most
+    gate = RepaintGate()
+    stream.on_frame = gate.notify
+
+    stream.start()
+    worker = threading.Thread(target=recognizer.run, name="recognizer", daemon=True)
+    worker.start()
+    while not stream.finished:
+        time.sleep(0.005)
+        if renderer is None or not gate.pending():
+            continue
+        time.sleep(gate.wait(recognizer.governor.overlay_interval_ms() / 1000.0, time.perf_counter()))
+        seq, frame = stream.read_seq()
+        if frame is not None and gate.take(seq, time.perf_counter()):
+            t = time.perf_counter()
+            renderer.render(frame)
+            profiler.lap("overlay_convert", t, seq)
+    time.sleep(0.2)   # let the last frame through
+    recognizer.stop()
+    worker.join(1.0)
+
+    moves = [m for m in backend.moves() if m[0] - stream.start_time >= args.warmup]
+    if len(moves) < 2:
+        raise SystemExit("no cursor movement recorded — is the presence gate skipping the hand?")
+    t0 = stream.start_time
+
+    def truth_fn(t):
+        return truth_on_screen(source, recognizer.mapper, t - t0)
+
+    lag, ncc, rms, per_window = motion_lag(
+        moves, truth_fn, t0 + args.warmup, t0 + args.seconds,
+        args.step / 1000.0, args.max_lag / 1000.0, args.window)
+
+    processed = len(pipeline)
+    return {
+        "args": vars(args),
+        "frames_published": len(stream.published),
+        "frames_with_cursor": processed,
+        "cursor_events": len(moves),
+        "motion_lag_ms": 1000.0 * lag,
+        "motion_lag_windows": distribution(per_window),
+        "correlation": ncc,
+        "rms_error_px": rms,
+        "pipeline": distribution(pipeline),
+        "stages": profiler.summary(),
+    }
+
+
+def print_result(res):
+    print(f"{res['frames_published']} frames published, {res['frames_with_cursor']} moved the cursor")
+    print(f"motion lag {res['motion_lag_ms']:.0f} ms   (correlation {res['correlation']:.4f}, "
+          f"RMS error at that lag {res['rms_error_px']:.1f} px)")
+    for name in ("motion_lag_windows", "pipeline"):
+        d = res[name]
+        if d:
+            print(f"{name:<20}{d['count']:>6} samples  p5 {d['p5_ms']:.1f}  p50 {d['p50_ms']:.1f}  "
+                  f"p95 {d['p95_ms']:.1f}  p99 {d['p99_ms']:.1f}  max {d['max_ms']:.1f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Headless motion-to-cursor latency measurement")
+    ap.add_argument("--stub-ms", type=float, default=0.0, help="fake inference time per frame")
+    ap.add_argument("--overlay", choices=("off", "offscreen"), default="off")
+    ap.add_argument("--config", default="session_config.json")
+    ap.add_argument("--seconds", type=float, default=20.0)
+    ap.add_argument("--warmup", type=float, default=1.0, help="seconds not measured")
+    ap.add_argument("--fps", type=float, default=30.0)
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--screen", type=parse_size, default=(1920, 1080))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--step", type=float, default=2.0, help="resampling step, ms")
+    ap.add_argument("--max-lag", type=float, default=500.0, help="largest lag searched, ms")
+    ap.add_argument("--window", type=float, default=2.0, help="window for the lag distribution, s")
+    ap.add_argument("--out", help="save the result as JSON")
+    args = ap.parse_args()
+
+    res = measure(args)
+    print_result(res)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
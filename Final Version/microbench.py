@@ -0,0 +1,173 @@
+"""
+Micro-benchmarks of the per-frame Python work that runs after inference:
+gesture detection, cursor smoothing, landmark filtering and conversion.
+No camera, no OS input — landmarks are synthetic or loaded from a
+recording (see frame_sources.save_landmarks) and cycled to reach the
+requested frame count.
+
+    python microbench.py                        # 1 000 000 synthetic frames
+    python microbench.py --frames 5000000 --landmarks session.npz --out micro.json
+
+Each result is nanoseconds per frame with the cost of the bare benchmark
+loop (same indexing, an empty call) subtracted.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from types import ModuleType, SimpleNamespace
+
+from frame_sources import Landmark, SyntheticHandSource, load_landmarks, stub_factory
+from hand_engine import HandGestureRecognizer, hand_array
+from input_backends import RecordingBackend
+from smoothing import LandmarkFilter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(n, m, frames, ts, fn):
+    t0 = time.perf_counter_ns()
+    for i in range(n):
+        fn(frames[i % m], ts[i])
+    return (time.perf_counter_ns() - t0) / n
+
+
+def make_recognizer(screen=(1920, 1080)):
+    # stub detector: the constructor warms its models up, nothing else runs
+    rec = HandGestureRecognizer(None, RecordingBackend(screen_size=screen),
+                                hands_factory=stub_factory(SimpleNamespace(current=[])))
+    # keep every move so the cursor path always reaches the backend
+    rec.backend.min_move_px = 0
+    return rec
+
+
+def noop(*args, **kwargs):
+    return None
+
+
+def stub_module(name, **attrs):
+    module = ModuleType(name)
+    module.__dict__.update(attrs)
+    module.__getattr__ = lambda attr: noop   # anything else is a no-op call
+    return module
+
+
+# What the legacy scripts import at the top but never touch in the code
+# benchmarked here — or must not touch: a real pyautogui would click.
+LEGACY_STUBS = {
+    "mediapipe": lambda: stub_module(
+        "mediapipe", solutions=SimpleNamespace(hands=SimpleNamespace(Hands=noop),
+                                               drawing_utils=SimpleNamespace())),
+    "pyautogui": lambda: stub_module("pyautogui"),
+    "win32gui": lambda: stub_module("win32gui"),
+}
+
+
+def import_legacy(name):
+    """Import one of the pre-"Final Version" scripts from the repo root with
+    MediaPipe, pyautogui and win32gui replaced by stubs, or None (with the
+    reason printed) if it still cannot be imported here."""
+    saved = {m: sys.modules.get(m) for m in LEGACY_STUBS}
+    sys.modules.update({m: make() for m, make in LEGACY_STUBS.items()})
+    sys.path.insert(0, REPO_ROOT)
+    try:
+        return importlib.import_module(name)
+    except Exception as e:
+        print(f"skipping {name}: {e}")
+        return None
+    finally:
+        sys.path.remove(REPO_ROOT)
+        for m, module in saved.items():
+            if module is None:
+                del sys.modules[m]
+            else:
+                sys.modules[m] = module
+
+
+def legacy_detect_gesture():
+    """Inzynierka_.detect_gesture — the rule set with the palm * 0.5 / 0.7
+    factors, open-palm and two-hand Resize tests."""
+    module = import_legacy("Inzynierka_")
+    return module and module.detect_gesture
+
+
+def io_tydz_v_recognizer():
+    """IO_tydz_V.HandGestureRecognizer, whose detect_gesture is the thumb to
+    index pinch with a 3-frame debounce and a 0.5 s hold."""
+    module = import_legacy("IO_tydz_V")
+    return module and module.HandGestureRecognizer(None)
+
+
+def run(args):
+    if args.landmarks:
+        t, pts, _ = load_landmarks(args.landmarks)
+    else:
+        src = SyntheticHandSource(frames=args.unique, seed=args.seed)
+        t, pts, _ = src.landmark_track()
+    m = len(pts)
+    n = args.frames
+    dt = float(t[1] - t[0]) if m > 1 else 1 / 30
+    ts = [i * dt for i in range(n)]
+    rows = list(pts)
+
+    results = {}
+    baseline = timed(n, m, rows, ts, lambda p, now: None)
+    results["loop_baseline"] = baseline
+
+    rec = make_recognizer()
+    results["detect_gestures"] = timed(
+        n, m, rows, ts, lambda p, now: rec.detect_gestures([p], now)) - baseline
+
+    rec = make_recognizer()
+    tips = [p[8] for p in rows]
+    results["smooth_cursor"] = timed(
+        n, m, tips, ts, lambda tip, now: rec.smooth_cursor(tip, now)) - baseline
+
+    rec = make_recognizer()
+    results["smooth_cursor+move_to"] = timed(
+        n, m, tips, ts, lambda tip, now: rec.backend.move_to(*rec.smooth_cursor(tip, now))) - baseline
+
+    f = LandmarkFilter()
+    results["landmark_filter"] = timed(n, m, rows, ts, f) - baseline
+
+    wrapped = [SimpleNamespace(landmark=[Landmark(*q) for q in p]) for p in rows]
+    results["hand_array"] = timed(
+        n, m, wrapped, ts, lambda h, now: hand_array(h)) - baseline
+
+    io_v = io_tydz_v_recognizer()
+    if io_v is not None:
+        landmark_rows = [h.landmark for h in wrapped]
+        results["io_tydz_v_detect_gesture"] = timed(
+            n, m, landmark_rows, ts, lambda lm, now: io_v.detect_gesture(lm)) - baseline
+
+    legacy = legacy_detect_gesture()
+    if legacy is not None:
+        handed = [SimpleNamespace(classification=[SimpleNamespace(label="Right")])]
+        results["legacy_detect_gesture"] = timed(
+            n, m, wrapped, ts, lambda h, now: legacy([h], handed, 1280, 720)) - baseline
+
+    return {"frames": n, "unique_frames": m, "ns_per_frame": results}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-frame gesture / smoothing micro-benchmarks")
+    ap.add_argument("--frames", type=int, default=1_000_000)
+    ap.add_argument("--unique", type=int, default=10_000, help="synthetic frames generated before cycling")
+    ap.add_argument("--landmarks", help="recorded landmarks (.npz) instead of synthetic ones")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="save the result as JSON")
+    args = ap.parse_args()
+
+    res = run(args)
+    print(f"{res['frames']} frames ({res['unique_frames']} unique)")
+    for name, ns in res["ns_per_frame"].items():
+        print(f"{name:<24}{ns:>10.0f} ns/frame")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import cv2
+import numpy as np
+from PIL import Image
+
+from frame_sources import BONES, PINCH_TIPS
+
+# "overlay" → "quality": the overlay is drawn at screen size / divisor and
+# Tk zooms it back up by that whole factor. At 15–40 % alpha the missing
+# detail is not visible. Resize, conversion and the PhotoImage upload shrink
+# with the pixel count; Tk's zoom copy still fills the full-size image
+# (OverlayRenderer.zoom() stands in for it in bench.py).
+OVERLAY_QUALITY = {"Full": 1, "Half": 2, "Third": 3, "Quarter": 4}
+INTERPOLATION = {"nearest": cv2.INTER_NEAREST, "linear": cv2.INTER_LINEAR}
+
+# skeleton and PiP landmarks ("overlay" → "mode": "skeleton" / "pip")
+FINGERTIPS = (4, 8, 12, 16, 20)
+# RGB; black is the skeleton window's transparent colour key, so nothing
+# is drawn in it
+BONE_RGB = (64, 192, 255)
+TIP_RGB = (255, 255, 255)
+ACTIVE_RGB = (255, 64, 64)
+
+
+def tk_colour(rgb):
+    return "#%02x%02x%02x" % rgb
+
+
+def active_tips(state):
+    """Fingertips taking part in the gesture_state() being shown."""
+    active = {tip for button, tip in PINCH_TIPS.items() if state.startswith(button)}
+    if active:
+        active.add(4)   # the thumb takes part in either pinch
+    return active
+
+
+class OverlayRenderer:
+    """
+    Camera frame → mirrored full-screen RGBA image for the overlay window.
+    Kept apart from Tk so benchmarks can render offscreen. With a divisor
+    above 1 the image is that many times smaller than the screen in each
+    direction and the window is expected to zoom it.
+
+    All buffers are allocated once (again only if the camera or screen
+    size changes): every step writes into its destination array, and the
+    returned PIL image is a view of the screen buffer, so a frame costs no
+    allocation (RGBA because PIL only wraps 4-byte pixels without copying;
+    alpha is always opaque). The image is overwritten by the next render()
+    — paste it into a persistent ImageTk.PhotoImage rather than keeping it.
+
+    zoom() repeats offscreen what Tk's "copy -zoom" does in the engine
+    (pixel replication up to full screen size), so benchmarks pay the
+    full-resolution write that a divisor does not save.
+    """
+
+    def __init__(self, screen_size, divisor=1, interpolation="linear"):
+        self.divisor = divisor
+        self.interpolation = INTERPOLATION[interpolation]
+        self.screen_size = None
+        self.size = None
+        self.set_screen(screen_size)
+        self.shape = None
+        self.scaled = None
+        self.flipped = None
+        self.screen = None
+        self.image = None
+        self.zoomed = None
+
+    def set_screen(self, screen_size):
+        """Call when the display changes; buffers follow on the next render."""
+        sw, sh = screen_size
+        d = self.divisor
+        self.screen_size = (sw, sh)
+        self.size = (-(-sw // d), -(-sh // d))   # round up so the zoom covers the screen
+
+    def allocate(self, shape):
+        sw, sh = self.size
+        self.shape = (shape, self.size)
+        self.scaled = np.empty((sh, sw, 3), dtype=np.uint8)
+        self.flipped = np.empty((sh, sw, 3), dtype=np.uint8)
+        self.screen = np.empty((sh, sw, 4), dtype=np.uint8)
+        # shares memory with self.screen — no copy per frame
+        self.image = Image.frombuffer("RGBA", self.size, self.screen, "raw", "RGBA", 0, 1)
+        sw, sh = self.screen_size
+        self.zoomed = np.empty((sh, sw, 4), dtype=np.uint8) if self.divisor > 1 else None
+
+    def render(self, frame):
+        if self.shape != (frame.shape, self.size):
+            self.allocate(frame.shape)
+        # scale first, so flip and colour conversion run at the output size
+        cv2.resize(frame, self.size, dst=self.scaled, interpolation=self.interpolation)
+        cv2.flip(self.scaled, 1, dst=self.flipped)
+        cv2.cvtColor(self.flipped, cv2.COLOR_BGR2RGBA, dst=self.screen)
+        return self.image
+
+    def zoom(self):
+        """Full-screen-size copy of the last render, as the engine's Tk zoom
+        makes it; the render itself when there is nothing to zoom."""
+        if self.zoomed is None:
+            return self.screen
+        cv2.resize(self.screen, self.screen_size, dst=self.zoomed, interpolation=cv2.INTER_NEAREST)
+        return self.zoomed
+
+
+class RepaintGate:
+    """
+    Overlay repaint pacing, driven by the capture side instead of a blind
+    timer. The capture (or recognizer) thread calls notify(seq) for every
+    published frame; it only stores the number, so a worker thread never
+    calls into Tk or waits for the display. The display thread polls
+    pending() on a short timer and take()s a frame: each frame is painted
+    once, no sooner than min_interval after the previous repaint — the
+    overlay never does more work than the camera delivers frames.
+    """
+
+    def __init__(self):
+        self.latest = 0
+        self.painted = 0
+        self.last = 0.0
+
+    def notify(self, seq):
+        self.latest = seq
+
+    def pending(self):
+        return self.latest > self.painted
+
+    def wait(self, min_interval, now):
+        """Seconds until a repaint is allowed."""
+        return max(0.0, self.last + min_interval - now)
+
+    def take(self, seq, now):
+        """True if frame seq should be painted now (and records it)."""
+        if seq <= self.painted:
+            return False
+        self.painted, self.last = seq, now
+        return True
+
+
+class SkeletonOverlay:
+    """
+    Hand skeleton, fingertip markers and gesture state on a Tk canvas over
+    a transparent background — overlay "mode": "skeleton". Every item is
+    created once and afterwards only moved or recoloured, so Tk redraws
+    just the rectangles the hand leaves and enters; the rest of the screen
+    is never touched and no image is uploaded. canvas is anything with the
+    Tk Canvas item API.
+    """
+
+    def __init__(self, canvas, screen_size, hands=2, tip_radius=8):
+        self.canvas = canvas
+        self.screen_size = tuple(screen_size)
+        self.tip_radius = tip_radius
+        hidden = {"state": "hidden"}
+        self.bones = [[canvas.create_line(0, 0, 0, 0, fill=tk_colour(BONE_RGB), width=3, **hidden)
+                       for _ in BONES] for _ in range(hands)]
+        self.tips = [[canvas.create_oval(0, 0, 0, 0, fill=tk_colour(TIP_RGB), outline="", **hidden)
+                      for _ in FINGERTIPS] for _ in range(hands)]
+        self.label = canvas.create_text(0, 0, fill=tk_colour(ACTIVE_RGB), anchor="n",
+                                        font=("Segoe UI", 16, "bold"), **hidden)
+        self.shown = [False] * hands
+        self.state = ""
+
+    def set_screen(self, screen_size):
+        self.screen_size = tuple(screen_size)
+
+    def show(self, i, visible):
+        if self.shown[i] != visible:
+            self.shown[i] = visible
+            state = "normal" if visible else "hidden"
+            for item in self.bones[i] + self.tips[i]:
+                self.canvas.itemconfigure(item, state=state)
+
+    def update(self, hands, state=""):
+        """hands: (21, 3) landmark arrays in mirrored, normalised image
+        coordinates (as the recognizer filters them); state: its
+        gesture_state()."""
+        c = self.canvas
+        sw, sh = self.screen_size
+        r = self.tip_radius
+        for i in range(len(self.shown)):
+            if i >= len(hands):
+                self.show(i, False)
+                continue
+            xy = hands[i][:, :2] * (sw, sh)
+            for item, (a, b) in zip(self.bones[i], BONES):
+                c.coords(item, xy[a, 0], xy[a, 1], xy[b, 0], xy[b, 1])
+            for item, tip in zip(self.tips[i], FINGERTIPS):
+                c.coords(item, xy[tip, 0] - r, xy[tip, 1] - r, xy[tip, 0] + r, xy[tip, 1] + r)
+            self.show(i, True)
+
+        if not hands:
+            state = ""
+        if state != self.state:
+            self.set_state(state)
+        if state:
+            # gesture name under the wrist
+            x, y = hands[0][0, :2] * (sw, sh)
+            c.coords(self.label, x, y + 2 * r)
+
+    def set_state(self, state):
+        """Recolour the pinching fingertips and relabel — only on a change."""
+        self.state = state
+        active = active_tips(state)
+        for tips in self.tips:
+            for item, tip in zip(tips, FINGERTIPS):
+                self.canvas.itemconfigure(item, fill=tk_colour(ACTIVE_RGB if tip in active else TIP_RGB))
+        self.canvas.itemconfigure(self.label, text=state, state="normal" if state else "hidden")
+
+
+class CursorMarker:
+    """
+    Ring following the gesture cursor on the main screen — pairs with the
+    PiP preview, so the presenter sees where the hand points without a
+    full-screen overlay. window is a small borderless Tk Toplevel whose
+    black is transparent, canvas a Canvas filling it. The window only
+    moves when the cursor did, and is recoloured only when the gesture
+    state changes.
+    """
+
+    def __init__(self, window, canvas, radius=14):
+        self.window = window
+        self.radius = radius
+        self.canvas = canvas
+        d = 2 * radius + 1
+        window.geometry(f"{d}x{d}+0+0")
+        self.ring = canvas.create_oval(3, 3, d - 3, d - 3, outline=tk_colour(BONE_RGB), width=3)
+        self.pos = None
+        self.state = ""
+
+    def update(self, x, y, state=""):
+        if x is None:
+            return
+        pos = (int(x) - self.radius, int(y) - self.radius)
+        if pos != self.pos:
+            self.pos = pos
+            self.window.geometry("+%d+%d" % pos)
+        if state != self.state:
+            self.state = state
+            self.canvas.itemconfigure(self.ring, outline=tk_colour(ACTIVE_RGB if state else BONE_RGB))
+
+
+def draw_hands(img, hands, state=""):
+    """
+    Compact landmark overlay for the PiP preview, drawn straight into the
+    RGBA image the renderer returned (its buffer) — at preview size that
+    is a few microseconds of line drawing.
+    """
+    h, w = img.shape[:2]
+    active = active_tips(state)
+    for pts in hands:
+        xy = (pts[:, :2] * (w, h)).astype(np.int32).tolist()
+        for a, b in BONES:
+            cv2.line(img, tuple(xy[a]), tuple(xy[b]), BONE_RGB + (255,), 1, cv2.LINE_AA)
+        for tip in FINGERTIPS:
+            colour = (ACTIVE_RGB if tip in active else TIP_RGB) + (255,)
+            cv2.circle(img, tuple(xy[tip]), 3, colour, -1, cv2.LINE_AA)
+
+
+def pip_geometry(cfg, screen_size, frame_size, margin=16):
+    """(width, height, x, y) of the PiP window: "pip_width" px wide (null
+    for the camera's own size) at the same aspect, in "pip_corner"
+    ("top-left", "top-right", "bottom-left" or "bottom-right")."""
+    fw, fh = frame_size
+    w = cfg.get("pip_width", 320) or fw
+    h = round(w * fh / fw)
+    corner = cfg.get("pip_corner", "bottom-right")
+    sw, sh = screen_size
+    x = sw - w - margin if corner.endswith("right") else margin
+    y = sh - h - margin if corner.startswith("bottom") else margin
+    return w, h, x, y
+
+
+def make_renderer(cfg, screen_size, frame_size=(1280, 720)):
+    """OverlayRenderer from the "overlay" section of session_config.json —
+    full screen, or preview-sized in PiP mode."""
+    if cfg.get("mode", "mirror") == "pip":
+        w, h, _, _ = pip_geometry(cfg, screen_size, frame_size)
+        return OverlayRenderer((w, h), 1, cfg.get("interpolation", "linear"))
+    return OverlayRenderer(screen_size, OVERLAY_QUALITY.get(cfg.get("quality", "Half"), 2),
+                           cfg.get("interpolation", "linear"))
@@ -0,0 +1,93 @@
+import cv2
+import numpy as np
+
+# YCrCb skin box — loose on purpose, motion does most of the rejecting
+SKIN_LOW  = np.array((0, 133, 77), dtype=np.uint8)
+SKIN_HIGH = np.array((255, 173, 127), dtype=np.uint8)
+
+
+class PresenceDetector:
+    """
+    Decides, on an 80x45 thumbnail, whether a hand could have entered the
+    frame, so hands.process only runs when it might find something.
+
+    The score is the fraction of thumbnail pixels that are both skin
+    coloured and moving (a still face scores ~0, a hand being raised does
+    not). While MediaPipe is tracking a hand every frame goes through.
+    Frames that passed on their own score and acquired a new hand teach the
+    detector what an arriving hand scores; the threshold is kept at the
+    level that `recall` of them pass. Every `force_interval` seconds a frame
+    is let through regardless. A hand found only on such a frame lowers the
+    threshold a step instead of being learned — a hand held still scores
+    ~0, and learning that would open the gate for good. The threshold never
+    drops below `min_threshold`, so a still, empty frame is always gated.
+    """
+
+    def __init__(self, recall=0.98, force_interval=0.5, size=(80, 45),
+                 motion_threshold=20, default_threshold=0.002, samples=256,
+                 min_threshold=0.0005, relax=0.9):
+        self.recall = recall
+        self.force_interval = force_interval
+        self.size = size
+        self.motion_threshold = motion_threshold
+        self.threshold = default_threshold
+        self.min_threshold = min_threshold
+        self.relax = relax
+
+        self.scores = np.zeros(samples, dtype=np.float64)
+        self.n_scores = 0
+        self.prev = None
+        self.last_score = 0.0
+        self.last_on_score = False
+        self.next_forced = 0.0
+
+        self.passed = 0
+        self.gated = 0
+
+    def score(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_NEAREST)
+        ycc = cv2.cvtColor(small, cv2.COLOR_BGR2YCrCb)
+        skin = cv2.inRange(ycc, SKIN_LOW, SKIN_HIGH)
+        y = ycc[:, :, 0]
+        prev, self.prev = self.prev, y
+        if prev is None:
+            return 1.0
+        moving = cv2.absdiff(y, prev) > self.motion_threshold
+        return float(np.count_nonzero(moving & (skin > 0))) / moving.size
+
+    def should_infer(self, frame, now, tracking):
+        s = self.last_score = self.score(frame)
+        self.last_on_score = not tracking and s >= self.threshold
+        if tracking or self.last_on_score or now >= self.next_forced:
+            self.next_forced = now + self.force_interval
+            self.passed += 1
+            return True
+        self.gated += 1
+        return False
+
+    def learn(self):
+        """Last frame acquired a new hand."""
+        if not self.last_on_score:
+            # found on a forced frame: the gate would have missed it
+            self.threshold = max(self.min_threshold, self.threshold * self.relax)
+            return
+        self.scores[self.n_scores % len(self.scores)] = self.last_score
+        self.n_scores += 1
+        if self.n_scores >= 32:
+            filled = self.scores[:min(self.n_scores, len(self.scores))]
+            self.threshold = max(self.min_threshold,
+                                 float(np.quantile(filled, 1.0 - self.recall)))
+
+    def gate_ratio(self):
+        total = self.passed + self.gated
+        return self.gated / total if total else 0.0
+
+
+def make_presence(cfg):
+    """Build from the "presence" section of session_config.json, or None."""
+    if not cfg.get("enabled", True):
+        return None
+    return PresenceDetector(
+        recall=cfg.get("recall", 0.98),
+        force_interval=cfg.get("force_interval_s", 0.5),
+    )
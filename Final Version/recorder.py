@@ -0,0 +1,189 @@
+import glob
+import json
+import os
+import queue
+import time
+from threading import Thread
+
+import cv2
+import numpy as np
+
+# codec → (file extension for imencode, quality parameter)
+CODECS = {
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+    "png": (".png", cv2.IMWRITE_PNG_COMPRESSION),   # lossless; quality = 0..9 effort
+}
+
+
+class SessionRecorder:
+    """
+    Records camera frames into a session directory from a background
+    writer thread: meta.json (engine config, codec, counters) plus
+    chunk_00000.npz, chunk_00001.npz, … each holding up to `chunk_frames`
+    encoded frames with their timestamps and sequence numbers.
+
+    offer() never blocks the capture thread — when the writer falls behind
+    the queue fills up and further frames are dropped and counted. Chunks
+    are written whole and renamed into place, so a crash loses at most the
+    one being filled.
+    """
+
+    def __init__(self, path, config=None, codec="jpeg", quality=90,
+                 chunk_frames=150, queue_frames=60):
+        self.path = path
+        self.config = config or {}
+        self.codec = codec
+        self.quality = quality
+        self.ext, param = CODECS[codec]
+        self.params = [param, quality]
+        self.chunk_frames = chunk_frames
+        self.queue = queue.Queue(queue_frames)
+
+        self.offered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+        self.chunks = 0
+        self.started = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.closed = False
+
+        os.makedirs(path)
+        self.write_meta()
+        self.thread = Thread(target=self.run, name="recorder", daemon=True)
+        self.thread.start()
+
+    def offer(self, seq, t, frame):
+        """Queue a frame for writing; False if it was dropped. The frame must
+        not be modified afterwards (cap.retrieve() returns a new array)."""
+        if self.closed:
+            return False
+        self.offered += 1
+        try:
+            self.queue.put_nowait((seq, t, frame))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def run(self):
+        ts, seqs, blobs = [], [], []
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            seq, t, frame = item
+            ok, buf = cv2.imencode(self.ext, frame, self.params)
+            if not ok:
+                self.failed += 1
+                continue
+            ts.append(t)
+            seqs.append(seq)
+            blobs.append(buf.ravel())
+            if len(blobs) >= self.chunk_frames:
+                self.write_chunk(ts, seqs, blobs)
+                ts, seqs, blobs = [], [], []
+        if blobs:
+            self.write_chunk(ts, seqs, blobs)
+        self.write_meta()
+
+    def write_chunk(self, ts, seqs, blobs):
+        name = os.path.join(self.path, f"chunk_{self.chunks:05d}.npz")
+        with open(name + ".tmp", "wb") as f:
+            # frames are already compressed — zipping them again buys nothing
+            np.savez(f, t=np.array(ts, dtype=np.float64),
+                     seq=np.array(seqs, dtype=np.int64),
+                     sizes=np.array([len(b) for b in blobs], dtype=np.int64),
+                     frames=np.concatenate(blobs))
+        os.replace(name + ".tmp", name)
+        self.written += len(blobs)
+        self.chunks += 1
+
+    def write_meta(self):
+        meta = {
+            "format": 1,
+            "codec": self.codec,
+            "quality": self.quality,
+            "chunk_frames": self.chunk_frames,
+            "started": self.started,
+            "frames_offered": self.offered,
+            "frames_dropped": self.dropped,
+            "frames_failed": self.failed,
+            "frames_written": self.written,
+            "chunks": self.chunks,
+            "config": self.config,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    def close(self, wait=True):
+        """Stop accepting frames; the writer finishes the queue, the last
+        chunk and meta.json. With wait, block until it has."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        if wait:
+            self.thread.join()
+
+    def status(self):
+        return (f"recording {self.path}: {self.written} written, "
+                f"{self.dropped} dropped of {self.offered}")
+
+
+def load_meta(path):
+    with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_session(path):
+    """Yields (t, seq, frame) for every recorded frame; t is relative to
+    the first frame."""
+    t0 = None
+    for name in sorted(glob.glob(os.path.join(path, "chunk_*.npz"))):
+        with np.load(name) as data:
+            ts, seqs, sizes, frames = data["t"], data["seq"], data["sizes"], data["frames"]
+        ends = np.cumsum(sizes)
+        for t, seq, start, end in zip(ts, seqs, ends - sizes, ends):
+            if t0 is None:
+                t0 = t
+            yield float(t - t0), int(seq), cv2.imdecode(frames[start:end], cv2.IMREAD_COLOR)
+
+
+def session_times(path):
+    """Timestamps of every recorded frame, relative to the first, without
+    decoding any frames."""
+    ts = [np.load(name)["t"] for name in sorted(glob.glob(os.path.join(path, "chunk_*.npz")))]
+    if not ts:
+        return np.zeros(0)
+    t = np.concatenate(ts)
+    return t - t[0]
+
+
+def session_path(directory):
+    """A new session directory name: timestamped to the second, with a
+    counter suffix when a session was already started in that second."""
+    base = os.path.join(directory, time.strftime("session_%Y%m%d_%H%M%S"))
+    path, n = base, 1
+    while os.path.exists(path):
+        path = f"{base}_{n}"
+        n += 1
+    return path
+
+
+def make_recorder(cfg, engine_cfg):
+    """Start a SessionRecorder from the "recording" section of
+    session_config.json, in a new timestamped directory."""
+    directory = cfg.get("directory", "recordings")
+    os.makedirs(directory, exist_ok=True)
+    while True:
+        try:
+            return SessionRecorder(
+                session_path(directory), engine_cfg,
+                codec=cfg.get("codec", "jpeg"),
+                quality=cfg.get("quality", 90),
+                chunk_frames=cfg.get("chunk_frames", 150),
+                queue_frames=cfg.get("queue_frames", 60),
+            )
+        except FileExistsError:
+            # another recorder took the name between the check and makedirs
+            continue
@@ -0,0 +1,98 @@
+"""
+Deterministic replay of hand landmarks through the recognizer on a
+VirtualClock: the clock is set to each frame's timestamp, so cooldowns,
+holds, debounce and smoothing behave exactly as they did live while the
+frames go through as fast as the CPU allows.
+
+    python replay.py                                  # 60 s synthetic hand
+    python replay.py --landmarks session.npz --repeat 3 --out events.json
+
+--repeat N replays N times and checks that every run produced the same
+events. The CPU budget governor measures real CPU time, so it is pinned
+to its start level, and the presence gate (which needs real frames) is off.
+"""
+import argparse
+import json
+import time
+
+from clock import VirtualClock
+from frame_sources import LandmarkSource, SyntheticHandSource, landmarks_aspect, load_landmarks, stub_factory
+from hand_engine import build_recognizer
+from input_backends import RecordingBackend
+from tool_config import load_config, parse_size
+
+
+def replay(recognizer, source, clock):
+    """Push every (t, frame, hands) of source through process_frame."""
+    frames = 0
+    for seq, (t, frame, _) in enumerate(source, 1):
+        clock.set(t)
+        recognizer.process_frame(seq, frame, clock.now())
+        frames = seq
+    recognizer.backend.flush()
+    return frames
+
+
+def make_source(args):
+    if args.landmarks:
+        t, pts, _ = load_landmarks(args.landmarks)
+        aspect = landmarks_aspect(args.landmarks)
+    else:
+        src = SyntheticHandSource(frames=int(args.seconds * 30), seed=args.seed)
+        t, pts, _ = src.landmark_track()
+        aspect = src.aspect
+    return LandmarkSource(t, pts, aspect)
+
+
+def run_once(args, cfg):
+    source = make_source(args)
+    clock = VirtualClock()
+    backend = RecordingBackend(screen_size=args.screen, clock=clock)
+    recognizer = build_recognizer(cfg, None, backend, hands_factory=stub_factory(source), clock=clock)
+    t0 = time.perf_counter()
+    frames = replay(recognizer, source, clock)
+    elapsed = time.perf_counter() - t0
+    duration = float(source.t[-1] - source.t[0]) if frames else 0.0
+    return frames, duration, elapsed, backend.events
+
+
+def summary(events):
+    counts = {}
+    for _, kind, _, _, button in events:
+        key = kind if button is None else f"{kind} {button}"
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Deterministic faster-than-real-time replay")
+    ap.add_argument("--landmarks", help="landmark recording (.npz); default is the synthetic hand")
+    ap.add_argument("--seconds", type=float, default=60.0, help="length of the synthetic recording")
+    ap.add_argument("--config", default="session_config.json")
+    ap.add_argument("--screen", type=parse_size, default=(1920, 1080))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--out", help="save the events of the first run as JSON")
+    args = ap.parse_args()
+
+    cfg = load_config(args.config, pinned=True)
+    cfg.setdefault("presence", {})["enabled"] = False
+
+    first = None
+    for i in range(args.repeat):
+        frames, duration, elapsed, events = run_once(args, cfg)
+        print(f"run {i + 1}: {frames} frames, {duration:.1f} s of recording in {elapsed:.2f} s "
+              f"({duration / elapsed:.0f}x real time)   {json.dumps(summary(events))}")
+        if first is None:
+            first = events
+        elif events != first:
+            raise SystemExit(f"run {i + 1} differs from run 1")
+    if args.repeat > 1:
+        print(f"all {args.repeat} runs identical")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump([list(e) for e in first], f)
+
+
+if __name__ == "__main__":
+    main()
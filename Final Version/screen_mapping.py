@@ -0,0 +1,107 @@
+SM_XVIRTUALSCREEN  = 76
+SM_YVIRTUALSCREEN  = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+SM_CMONITORS       = 80
+
+
+def monitor_rects():
+    """(left, top, width, height) of every monitor, or None off Windows."""
+    try:
+        import win32api
+    except ImportError:
+        return None
+    rects = []
+    for _, _, (l, t, r, b) in win32api.EnumDisplayMonitors():
+        rects.append((l, t, r - l, b - t))
+    return rects
+
+
+def virtual_desktop():
+    try:
+        import win32api
+    except ImportError:
+        return None
+    m = win32api.GetSystemMetrics
+    return (m(SM_XVIRTUALSCREEN), m(SM_YVIRTUALSCREEN),
+            m(SM_CXVIRTUALSCREEN), m(SM_CYVIRTUALSCREEN))
+
+
+def display_signature():
+    # cheap enough to poll once a second — changes whenever a monitor is
+    # added, removed, moved or re-scaled
+    try:
+        import win32api
+    except ImportError:
+        return None
+    return virtual_desktop() + (win32api.GetSystemMetrics(SM_CMONITORS),)
+
+
+class ScreenMapper:
+    """
+    Maps normalised camera coordinates to screen pixels.
+
+    Only the active_region (x0, y0, x1, y1) of the camera frame is used:
+    it is stretched over the target monitor, so the hand can stay in the
+    well-tracked centre of the frame. The affine coefficients are computed
+    in refresh(); map() is a multiply-add and a clamp per axis.
+    """
+
+    def __init__(self, backend, active_region=(0.0, 0.0, 1.0, 1.0), monitor="primary"):
+        self.backend = backend
+        self.active_region = tuple(active_region)
+        self.monitor = monitor
+        self.signature = None
+        self.refresh()
+
+    def target_rect(self):
+        rect = None
+        if self.monitor == "virtual":
+            rect = virtual_desktop()
+        elif isinstance(self.monitor, int):
+            rects = monitor_rects()
+            if rects and 0 <= self.monitor < len(rects):
+                rect = rects[self.monitor]
+        if rect is None:
+            w, h = self.backend.size()
+            rect = (0, 0, w, h)
+        return rect
+
+    def refresh(self):
+        left, top, w, h = self.target_rect()
+        x0, y0, x1, y1 = self.active_region
+        sx = w / (x1 - x0)
+        sy = h / (y1 - y0)
+        # one tuple, swapped in a single assignment — the recognizer thread
+        # never sees half-updated coefficients. The clamp stays 1 px inside
+        # the monitor: pyautogui's fail-safe fires on a screen corner, and a
+        # hand beyond the active region's corner would land exactly there.
+        self.coeffs = (sx, left - x0 * sx, left + 1, left + w - 2,
+                       sy, top - y0 * sy, top + 1, top + h - 2)
+        self.signature = display_signature()
+
+    def check_display(self):
+        if display_signature() != self.signature:
+            self.refresh()
+            return True
+        return False
+
+    def set_active_region(self, region):
+        self.active_region = tuple(region)
+        self.refresh()
+
+    def calibrate(self, xs, ys, margin=0.05):
+        """Fit the active region to fingertip samples gathered while the
+        user sweeps the comfortable reach of their hand."""
+        x0, x1 = max(min(xs) - margin, 0.0), min(max(xs) + margin, 1.0)
+        y0, y1 = max(min(ys) - margin, 0.0), min(max(ys) + margin, 1.0)
+        if x1 - x0 > 0.1 and y1 - y0 > 0.1:
+            self.set_active_region((x0, y0, x1, y1))
+        return self.active_region
+
+    def map(self, nx, ny):
+        sx, ox, minx, maxx, sy, oy, miny, maxy = self.coeffs
+        x = nx * sx + ox
+        y = ny * sy + oy
+        return (minx if x < minx else maxx if x > maxx else x,
+                miny if y < miny else maxy if y > maxy else y)
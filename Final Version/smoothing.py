@@ -0,0 +1,60 @@
+import numpy as np
+
+# The launcher's "interpolation" slider was tuned with the engine running at
+# roughly camera rate, so a factor is interpreted as "per frame at 30 FPS".
+REFERENCE_FPS = 30.0
+
+
+def ema_alpha(factor, dt, reference_fps=REFERENCE_FPS):
+    """
+    Exponential-smoothing coefficient for a frame that arrived dt seconds
+    after the previous one. Applying ema_alpha(f, dt) once gives the same
+    decay as applying f at reference_fps for dt seconds, so the cursor
+    feels identical at 10 and at 30 FPS.
+    """
+    if factor >= 1.0:
+        return 1.0
+    return 1.0 - (1.0 - factor) ** (dt * reference_fps)
+
+
+def _lowpass_alpha(cutoff, dt):
+    # cutoff may be a scalar or an array of per-coordinate cutoffs
+    return 1.0 / (1.0 + 1.0 / (2.0 * np.pi * cutoff * dt))
+
+
+class LandmarkFilter:
+    """
+    One Euro filter over a whole (21, 3) landmark array at once.
+
+    Every coordinate gets its own adaptive cutoff: still fingertips are
+    smoothed hard (no pinch flicker), fast ones are passed through with
+    little lag. Units are normalised image coordinates per second.
+    """
+
+    def __init__(self, min_cutoff=2.0, beta=10.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.dx = None
+        self.t = None
+
+    def __call__(self, pts, now):
+        if self.x is None:
+            self.x = np.array(pts, dtype=np.float64)
+            self.dx = np.zeros_like(self.x)
+            self.t = now
+            return self.x
+        dt = now - self.t
+        if dt <= 0:
+            return self.x
+        self.t = now
+
+        delta = pts - self.x
+        self.dx += _lowpass_alpha(self.d_cutoff, dt) * (delta / dt - self.dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        self.x += _lowpass_alpha(cutoff, dt) * delta
+        return self.x
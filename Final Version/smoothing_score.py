@@ -0,0 +1,298 @@
+"""
+Objective scores for cursor filters, over a grid of filter parameters.
+
+    python smoothing_score.py                                 # synthetic steps, 3 px noise
+    python smoothing_score.py --landmarks a.npz b.npz         # recorded fingertip tracks too
+    python smoothing_score.py --landmarks a.npz --write-defaults
+
+Filters, each run for every combination of its parameters at once (the
+state is an array over the grid, time is the only loop):
+  ema        the engine's smooth_cursor: frame-rate independent exponential
+             average ("interpolation") with the epsilon dead zone of
+             IO_tydz_V — the cursor only moves when a step exceeds epsilon px
+  one_euro   One Euro filter (min_cutoff, beta) plus optional linear
+             prediction `lead` seconds ahead along its velocity estimate
+  kalman     constant-velocity Kalman filter (process noise q, measurement
+             noise r) plus the same optional prediction
+
+Scores:
+  jitter     RMS distance from the true position while the hand is still, px
+  lag        how much later than the true path the cursor gets within 10%
+             of the step length of a step move's target, ms
+  overshoot  how far past the target the cursor runs, % of the step length
+  error      RMS distance from the true path over everything, px
+
+Tracks are synthetic still / step sequences with Gaussian noise — at the
+level measured on the recordings when --landmarks are given — and, with
+--landmarks, the recorded fingertip tracks themselves, scored against a
+zero-phase smoothed copy. --write-defaults stores the best ema setting as
+the launcher's "Cursor Motion Smoothing" values in session_config.json.
+"""
+import argparse
+import json
+
+import numpy as np
+
+from frame_sources import load_landmarks
+from input_backends import RecordingBackend
+from screen_mapping import ScreenMapper
+from smoothing import REFERENCE_FPS, _lowpass_alpha
+from tool_config import load_config, parse_size
+from tune import make_grid, parse_range
+
+FAMILIES = {
+    "ema": {"factor": "0.3:1.0:0.05", "epsilon": "0:12:2"},
+    "one_euro": {"min_cutoff": "0.25,0.5,1,2,4", "beta": "0,0.001,0.003,0.01,0.03", "lead": "0,0.02,0.04"},
+    "kalman": {"q": "1e4,3e4,1e5,3e5,1e6,3e6", "r": "4,16,64", "lead": "0,0.02,0.04"},
+}
+
+
+# ── 1) Filters: z (N, 2) measurements at times t (N,) → (P, N, 2) ────────────
+def run_ema(t, z, g):
+    f, eps = g["factor"][:, None], g["epsilon"][:, None]
+    out = np.empty((len(f), len(t), 2))
+    prev = np.broadcast_to(z[0], (len(f), 2)).copy()
+    out[:, 0] = prev
+    for i in range(1, len(t)):
+        a = np.where(f >= 1.0, 1.0, 1.0 - (1.0 - f) ** ((t[i] - t[i - 1]) * REFERENCE_FPS))
+        cand = prev + (z[i] - prev) * a
+        move = (np.abs(cand - prev) > eps).any(axis=1, keepdims=True)
+        prev = np.where(move, cand, prev)
+        out[:, i] = prev
+    return out
+
+
+def run_one_euro(t, z, g, d_cutoff=1.0):
+    mc, beta, lead = g["min_cutoff"][:, None], g["beta"][:, None], g["lead"][:, None]
+    out = np.empty((len(mc), len(t), 2))
+    x = np.broadcast_to(z[0], (len(mc), 2)).copy()
+    dx = np.zeros_like(x)
+    out[:, 0] = x
+    for i in range(1, len(t)):
+        dt = t[i] - t[i - 1]
+        delta = z[i] - x
+        dx += _lowpass_alpha(d_cutoff, dt) * (delta / dt - dx)
+        x += _lowpass_alpha(mc + beta * np.abs(dx), dt) * delta
+        out[:, i] = x + lead * dx
+    return out
+
+
+def run_kalman(t, z, g):
+    # x and y are independent with identical covariances, so P is per grid point
+    q, r, lead = g["q"], g["r"], g["lead"][:, None]
+    n = len(q)
+    pos = np.broadcast_to(z[0], (n, 2)).copy()
+    vel = np.zeros((n, 2))
+    p00, p01, p11 = r.copy(), np.zeros(n), np.full(n, 1e6)
+    out = np.empty((n, len(t), 2))
+    out[:, 0] = pos
+    for i in range(1, len(t)):
+        dt = t[i] - t[i - 1]
+        pos = pos + vel * dt
+        p00 = p00 + dt * (2 * p01 + dt * p11) + q * dt ** 3 / 3
+        p01 = p01 + dt * p11 + q * dt ** 2 / 2
+        p11 = p11 + q * dt
+        s = p00 + r
+        k0, k1 = (p00 / s)[:, None], (p01 / s)[:, None]
+        innov = z[i] - pos
+        pos = pos + k0 * innov
+        vel = vel + k1 * innov
+        p00, p01, p11 = (1 - k0[:, 0]) * p00, (1 - k0[:, 0]) * p01, p11 - k1[:, 0] * p01
+        out[:, i] = pos + lead * vel
+    return out
+
+
+RUNNERS = {"ema": run_ema, "one_euro": run_one_euro, "kalman": run_kalman}
+
+
+# ── 2) Tracks ────────────────────────────────────────────────────────────────
+def step_track(seconds, fps, screen, noise_px, seed):
+    """Still periods joined by 200 ms minimum-jerk moves to random targets."""
+    rng = np.random.default_rng(seed)
+    w, h = screen
+    n = int(seconds * fps)
+    truth = np.empty((n, 2))
+    pos = np.array((w / 2, h / 2))
+    m = max(int(0.2 * fps), 2)
+    s = np.arange(1, m + 1) / m
+    mj = (10 * s ** 3 - 15 * s ** 4 + 6 * s ** 5)[:, None]
+    i = 0
+    while i < n:
+        still = int(rng.uniform(1.0, 2.0) * fps)
+        truth[i:i + still] = pos
+        i += still
+        target = rng.uniform((0.1 * w, 0.1 * h), (0.9 * w, 0.9 * h))
+        seg = (pos + (target - pos) * mj)[:max(0, min(m, n - i))]
+        truth[i:i + len(seg)] = seg
+        pos = target
+        i += m
+    t = np.arange(n) / fps
+    return t, truth + rng.normal(0.0, noise_px, (n, 2)), truth
+
+
+def zero_phase(z, sigma=2.0):
+    """Non-causal Gaussian smoothing — the reference path of a recording."""
+    k = np.arange(-int(3 * sigma), int(3 * sigma) + 1)
+    kernel = np.exp(-0.5 * (k / sigma) ** 2)
+    kernel /= kernel.sum()
+    pad = np.pad(z, ((len(k) // 2, len(k) // 2), (0, 0)), mode="edge")
+    return np.stack([np.convolve(pad[:, j], kernel, mode="valid") for j in range(2)], axis=1)
+
+
+def recorded_tracks(paths, mapper, min_len=60):
+    """Contiguous hand-present runs of the index fingertip, in screen px."""
+    sx, ox, minx, maxx, sy, oy, miny, maxy = mapper.coeffs
+    tracks = []
+    for path in paths:
+        t, pts, _ = load_landmarks(path)
+        tip = pts[:, 8, :2]
+        present = ~np.isnan(tip[:, 0])
+        edges = np.flatnonzero(np.diff(np.r_[0, present.astype(int), 0]))
+        for a, b in zip(edges[::2], edges[1::2]):
+            if b - a < min_len:
+                continue
+            z = np.stack([np.clip(tip[a:b, 0] * sx + ox, minx, maxx),
+                          np.clip(tip[a:b, 1] * sy + oy, miny, maxy)], axis=1)
+            tracks.append((t[a:b], z, zero_phase(z)))
+    return tracks
+
+
+def still_mask(t, truth, speed=20.0, min_still=0.3):
+    v = np.r_[0.0, np.hypot(*np.diff(truth, axis=0).T) / np.diff(t)]
+    still = v < speed
+    # only runs long enough to count as holding still
+    edges = np.flatnonzero(np.diff(np.r_[0, still.astype(int), 0]))
+    mask = np.zeros(len(t), dtype=bool)
+    for a, b in zip(edges[::2], edges[1::2]):
+        if t[b - 1] - t[a] >= min_still:
+            mask[a:b] = True
+    return mask
+
+
+def noise_level(tracks):
+    res = [z[still_mask(t, ref)] - ref[still_mask(t, ref)] for t, z, ref in tracks]
+    res = np.concatenate(res) if res else np.zeros((0, 2))
+    return float(np.sqrt((res ** 2).mean())) if len(res) > 10 else None
+
+
+# ── 3) Scores ────────────────────────────────────────────────────────────────
+def score(t, out, truth, window=1.0):
+    """Per grid point: jitter / error sums and per-step lag and overshoot."""
+    still = still_mask(t, truth)
+    err2 = ((out - truth) ** 2).sum(axis=2)
+    res = {"jitter_sse": err2[:, still].sum(axis=1), "jitter_n": int(still.sum()),
+           "error_sse": err2.sum(axis=1), "error_n": len(t), "lag": [], "overshoot": []}
+    # a step: a move between two still runs; it ends where the second begins
+    starts = np.flatnonzero(still[1:] & ~still[:-1]) + 1
+    for e in starts:
+        before = np.flatnonzero(still[:e] & ~np.r_[still[1:e], False])
+        if not len(before):
+            continue
+        s = before[-1]
+        step = truth[e] - truth[s]
+        length = np.hypot(*step)
+        if length < 50:
+            continue
+        w = np.searchsorted(t, t[e] + window)
+        arrived = s + np.argmax(np.hypot(*(truth[s:w] - truth[e]).T) < 0.1 * length)
+        d = np.hypot(*(out[:, s:w] - truth[e]).transpose(2, 0, 1))
+        near = d < 0.1 * length
+        first = s + np.where(near.any(axis=1), near.argmax(axis=1), w - 1 - s)
+        res["lag"].append(t[first] - t[arrived])
+        past = ((out[:, e:w] - truth[e]) @ (step / length))
+        res["overshoot"].append(100.0 * np.maximum(past.max(axis=1), 0.0) / length)
+    return res
+
+
+def combine(parts):
+    jn = sum(p["jitter_n"] for p in parts)
+    en = sum(p["error_n"] for p in parts)
+    lag = [l for p in parts for l in p["lag"]]
+    over = [o for p in parts for o in p["overshoot"]]
+    n = len(parts[0]["error_sse"])
+    return {
+        "jitter_px": np.sqrt(sum(p["jitter_sse"] for p in parts) / jn) if jn else np.full(n, np.nan),
+        "lag_ms": 1000.0 * np.mean(lag, axis=0) if lag else np.full(n, np.nan),
+        "overshoot_pct": np.mean(over, axis=0) if over else np.full(n, np.nan),
+        "error_px": np.sqrt(sum(p["error_sse"] for p in parts) / en),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cursor filter quality scores over parameter grids")
+    ap.add_argument("--landmarks", nargs="*", default=[], help="recorded landmark tracks (.npz)")
+    ap.add_argument("--seconds", type=float, default=120.0, help="length of the synthetic step track")
+    ap.add_argument("--fps", type=float, default=30.0)
+    ap.add_argument("--noise-px", type=float, help="synthetic noise; default measured, else 3")
+    ap.add_argument("--screen", type=parse_size, default=(1920, 1080))
+    ap.add_argument("--config", default="session_config.json")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--families", nargs="*", default=list(FAMILIES), choices=list(FAMILIES))
+    ap.add_argument("--weights", default="1,1,1",
+                    help="cost = a * jitter/raw jitter + b * lag/100 ms + c * overshoot/10 %%")
+    ap.add_argument("--top", type=int, default=5)
+    ap.add_argument("--write-defaults", action="store_true",
+                    help="store the best ema setting as the launcher's smoothing values")
+    ap.add_argument("--out", help="save all scores as JSON")
+    for fam, params in FAMILIES.items():
+        for name, default in params.items():
+            ap.add_argument(f"--{fam.replace('_', '-')}-{name.replace('_', '-')}", default=default)
+    args = ap.parse_args()
+
+    cfg = load_config(args.config)
+    map_cfg = cfg.get("mapping", {})
+    mapper = ScreenMapper(RecordingBackend(screen_size=args.screen),
+                          map_cfg.get("active_region", (0.0, 0.0, 1.0, 1.0)))
+    recorded = recorded_tracks(args.landmarks, mapper)
+    measured = noise_level(recorded)
+    noise = args.noise_px or measured or 3.0
+    print(f"noise {noise:.2f} px" + (" (measured)" if not args.noise_px and measured else ""))
+    tracks = [step_track(args.seconds, args.fps, args.screen, noise, args.seed)] + recorded
+
+    cs = cfg.get("cursor_smoothing", {})
+    current = {"factor": cs.get("interpolation", 80) / 100.0, "epsilon": float(cs.get("epsilon", 0))}
+    wj, wl, wo = (float(v) for v in args.weights.split(","))
+    raw_jitter = noise * np.sqrt(2)   # RMS distance of unfiltered 2-D noise
+    report = {}
+    for fam in args.families:
+        axes = {n: parse_range(getattr(args, f"{fam}_{n}")) for n in FAMILIES[fam]}
+        if fam == "ema":   # always score what the launcher is set to now
+            axes = {n: np.union1d(axes[n], [current[n]]) for n in axes}
+        grid = make_grid(list(axes), axes)
+        s = combine([score(t, RUNNERS[fam](t, z, grid), truth) for t, z, truth in tracks])
+        cost = (wj * s["jitter_px"] / raw_jitter + wl * np.nan_to_num(s["lag_ms"], nan=1e3) / 100.0
+                + wo * np.nan_to_num(s["overshoot_pct"]) / 10.0)
+        order = np.argsort(cost)
+        report[fam] = [{**{n: float(grid[n][i]) for n in grid},
+                        **{k: float(v[i]) for k, v in s.items()}, "cost": float(cost[i])}
+                       for i in order]
+
+        print(f"\n{fam}: {len(cost)} settings")
+        print("".join(f"{n:>12}" for n in grid) + f"{'jitter px':>11}{'lag ms':>9}{'over %':>9}"
+              f"{'error px':>10}{'cost':>8}")
+        for row in report[fam][:args.top]:
+            print("".join(f"{row[n]:>12.4g}" for n in grid) + f"{row['jitter_px']:>11.2f}"
+                  f"{row['lag_ms']:>9.0f}{row['overshoot_pct']:>9.1f}{row['error_px']:>10.2f}{row['cost']:>8.2f}")
+
+    if "ema" in report:
+        cur = next((r for r in report["ema"] if np.isclose(r["factor"], current["factor"])
+                    and np.isclose(r["epsilon"], current["epsilon"])), None)
+        if cur:
+            print(f"\ncurrent launcher setting (interpolation {cs.get('interpolation', 80)}, "
+                  f"epsilon {cs.get('epsilon', 0)}): jitter {cur['jitter_px']:.2f} px, lag {cur['lag_ms']:.0f} ms, "
+                  f"overshoot {cur['overshoot_pct']:.1f} %, cost {cur['cost']:.2f}")
+        if args.write_defaults:
+            best = report["ema"][0]
+            cfg["cursor_smoothing"] = {"epsilon": int(round(best["epsilon"])),
+                                       "interpolation": int(round(100 * best["factor"]))}
+            with open(args.config, "w", encoding="utf-8") as f:
+                json.dump(cfg, f, indent=2)
+            print(f"wrote {cfg['cursor_smoothing']} to {args.config}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"noise_px": noise, "results": report}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
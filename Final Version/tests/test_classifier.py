@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from classifier import (KNNClassifier, MLPClassifier, PoseClassifier, hand_features,
+                        load_classifier, make_classifier, save_classifier)
+from frame_sources import SyntheticHandSource
+
+CLASSES = ["none", "left", "right"]
+
+
+@pytest.fixture(scope="module")
+def data():
+    src = SyntheticHandSource(frames=900, seed=3)
+    _, pts, labels = src.landmark_track()
+    y = np.array([CLASSES.index(l) for l in labels])
+    return pts, hand_features(pts, src.aspect), y, src.aspect
+
+
+def test_features_ignore_position_size_and_tilt():
+    pts = SyntheticHandSource(frames=1, seed=0).landmark_track()[1][0]
+    aspect = 16 / 9
+    xy = pts[:, :2] * (aspect, 1.0)
+    angle = 0.4
+    rot = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    moved = (xy - xy[0]) @ rot.T * 1.7 + xy[0] + (0.1, -0.05)
+    other = pts.copy()
+    other[:, :2] = moved / (aspect, 1.0)
+    assert np.allclose(hand_features(other, aspect), hand_features(pts, aspect))
+    assert not np.allclose(hand_features(other, 4 / 3), hand_features(pts, 4 / 3))
+
+
+def test_features_are_batched():
+    pts = SyntheticHandSource(frames=4, seed=0).landmark_track()[1]
+    batch = hand_features(pts)
+    assert batch.shape == (4, 40)
+    assert np.allclose(batch[2], hand_features(pts[2]))
+
+
+@pytest.mark.parametrize("model", [MLPClassifier(CLASSES), KNNClassifier(CLASSES, max_samples=900)])
+def test_models_learn_the_synthetic_pinches(data, model):
+    _, X, y, _ = data
+    model.fit(X[::2], y[::2])
+    accuracy = (model.predict(X[1::2]) == y[1::2]).mean()
+    assert accuracy > 0.95
+    proba = model.predict_proba(X[:5])
+    assert proba.shape == (5, 3) and np.allclose(proba.sum(axis=1), 1.0)
+
+
+@pytest.mark.parametrize("cls", [MLPClassifier, KNNClassifier])
+def test_saved_model_predicts_the_same(tmp_path, data, cls):
+    _, X, y, aspect = data
+    model = cls(CLASSES).fit(X, y, epochs=50)
+    model.aspect = aspect
+    path = str(tmp_path / "model.npz")
+    save_classifier(path, model)
+    loaded = load_classifier(path)
+    assert loaded.classes == CLASSES and loaded.aspect == pytest.approx(aspect)
+    assert np.allclose(loaded.predict_proba(X[:50]), model.predict_proba(X[:50]))
+
+
+def test_pose_classifier_falls_back_to_none_when_unsure(data):
+    pts, X, y, aspect = data
+    model = KNNClassifier(CLASSES, k=5).fit(X, y)
+    model.aspect = aspect
+    i = int(np.flatnonzero(y == CLASSES.index("left"))[5])
+    assert PoseClassifier(model, min_proba=0.6)(pts[i]) == "left"
+    assert PoseClassifier(model, min_proba=1.01)(pts[i]) == "none"
+
+
+def test_make_classifier_without_a_model(tmp_path):
+    assert make_classifier({"detector": "rules"}) is None
+    assert make_classifier({"detector": "classifier",
+                            "model_file": str(tmp_path / "missing.npz")}) is None
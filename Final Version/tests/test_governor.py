@@ -0,0 +1,147 @@
+import numpy as np
+
+from governor import (ACTIVE, IDLE, QUALITY_LEVELS, SLEEP, BudgetGovernor,
+                      HandCountGovernor, PowerGovernor)
+
+STILL = np.full((72, 128, 3), 60, dtype=np.uint8)
+
+
+def moved():
+    frame = STILL.copy()
+    frame[:, :64] = 200
+    return frame
+
+
+def test_states_follow_the_time_without_a_hand():
+    gov = PowerGovernor(idle_after=5.0, sleep_after=30.0)
+    assert gov.update(0.0, True) == ACTIVE
+    assert gov.update(4.9, False) == ACTIVE
+    assert gov.update(5.0, False) == IDLE
+    assert gov.update(30.0, False) == SLEEP
+    assert gov.overlay_interval_ms() == 500
+
+
+def test_a_detection_wakes_straight_to_active():
+    gov = PowerGovernor(idle_after=1.0, sleep_after=2.0)
+    gov.update(0.0, False)
+    gov.update(3.0, False)
+    assert gov.state == SLEEP
+    assert gov.update(3.1, True) == ACTIVE
+    assert gov.wakeups == 1
+    assert gov.should_process(STILL, 3.1)
+
+
+def test_lower_states_process_fewer_frames():
+    gov = PowerGovernor(idle_after=1.0, idle_fps=10.0, motion_threshold=None)
+    gov.update(0.0, False)
+    gov.update(1.0, False)
+    assert gov.state == IDLE
+    assert not gov.should_process(STILL, 1.05)
+    assert gov.should_process(STILL, 1.1)
+    assert gov.capture_interval() == 0.05
+
+
+def test_motion_lets_a_frame_through_between_due_times():
+    gov = PowerGovernor(idle_after=1.0, idle_fps=1.0)
+    gov.update(0.0, False)
+    gov.update(1.0, False)
+    assert not gov.should_process(STILL, 1.1)     # first thumbnail
+    assert not gov.should_process(STILL, 1.2)
+    assert gov.should_process(moved(), 1.3)
+    assert gov.motion_hits == 1
+
+
+def test_active_state_ignores_motion_until_due():
+    gov = PowerGovernor()
+    gov.update(0.0, True)
+    gov.next_due = 1.0
+    assert not gov.should_process(moved(), 0.5)
+
+
+def run_window(gov, now, frame_ms):
+    gov.record(frame_ms / 1000.0)
+    return gov.tick(now)
+
+
+def test_step_down_needs_hold_windows_over_budget():
+    gov = BudgetGovernor(frame_ms=10, hold=2)
+    gov.tick(0.0)
+    assert not run_window(gov, 1.0, 20)
+    assert run_window(gov, 2.0, 20)
+    assert gov.level == 1
+
+
+def test_band_between_headroom_and_budget_holds_the_level():
+    gov = BudgetGovernor(frame_ms=10, level=2, hold=2, headroom=0.7)
+    gov.tick(0.0)
+    for second in range(1, 10):
+        assert not run_window(gov, float(second), 8)
+    assert gov.level == 2
+
+
+def test_over_budget_streak_is_broken_by_a_quiet_window():
+    gov = BudgetGovernor(frame_ms=10, hold=2)
+    gov.tick(0.0)
+    run_window(gov, 1.0, 20)
+    run_window(gov, 2.0, 9)
+    assert not run_window(gov, 3.0, 20)
+    assert gov.level == 0
+
+
+def test_abandoned_level_is_retried_after_exponential_backoff():
+    gov = BudgetGovernor(frame_ms=10, hold=2)
+    gov.tick(0.0)
+    run_window(gov, 1.0, 20)
+    run_window(gov, 2.0, 20)
+    assert gov.level == 1 and gov.strikes == {0: 1}
+    # level 0 had one strike: 2 * 2 ** 1 quiet windows before retrying it
+    results = [run_window(gov, 3.0 + i, 2) for i in range(4)]
+    assert results == [False, False, False, True]
+    assert gov.level == 0
+
+
+def test_lowest_level_is_a_floor():
+    gov = BudgetGovernor(frame_ms=10, level=len(QUALITY_LEVELS) - 1, hold=1)
+    gov.tick(0.0)
+    assert not run_window(gov, 1.0, 50)
+    assert gov.level == len(QUALITY_LEVELS) - 1
+
+
+def settled_hand_count(**kwargs):
+    gov = HandCountGovernor(probe_interval=1.0, timeout=2.0, **kwargs)
+    assert gov.max_hands(STILL, 0.0, 0.3) == 2      # first frame is a probe
+    return gov
+
+
+def test_one_hand_model_between_probes():
+    gov = settled_hand_count()
+    assert [gov.max_hands(STILL, t, 0.3) for t in (0.1, 0.5, 0.9)] == [1, 1, 1]
+    assert gov.max_hands(STILL, 1.0, 0.3) == 2
+    assert gov.probes == 2
+
+
+def test_two_hands_seen_keep_the_two_hand_model_until_timeout():
+    gov = settled_hand_count()
+    gov.update(0.2, 2)
+    assert gov.max_hands(STILL, 0.5, 0.3) == 2
+    gov.update(0.5, 1)
+    assert gov.max_hands(STILL, 0.9, 0.3) == 2
+    assert gov.max_hands(STILL, 2.3, 0.3) == 2      # probe at 2.3 anyway
+    assert gov.max_hands(STILL, 2.5, 0.3) == 1
+
+
+def test_motion_on_the_other_half_asks_for_two_hands():
+    gov = settled_hand_count()
+    gov.max_hands(STILL, 0.1, 0.3)
+    other = STILL.copy()
+    other[:, 64:] = 200                             # right half, hand is left
+    assert gov.max_hands(other, 0.2, 0.3) == 2
+    assert gov.cues == 1
+    same = other.copy()
+    same[:, :64] = 200                              # now only the hand's half moves
+    assert gov.max_hands(same, 0.3, 0.3) == 1
+
+
+def test_disabled_always_uses_two_hands():
+    gov = HandCountGovernor(enabled=False)
+    assert gov.max_hands(STILL, 0.5, 0.3) == 2
@@ -0,0 +1,52 @@
+import numpy as np
+
+from clock import VirtualClock
+from frame_sources import SyntheticHandSource, stub_factory
+from hand_engine import build_recognizer
+from input_backends import RecordingBackend
+
+
+FRAME = np.zeros((36, 64, 3), dtype=np.uint8)
+
+
+def make_recognizer(backend, clock):
+    source = type("Source", (), {"current": []})()
+    cfg = {"performance": {"cpu_percent": None, "frame_ms": None}}
+    recognizer = build_recognizer(cfg, None, backend, hands_factory=stub_factory(source), clock=clock)
+    return recognizer, source
+
+
+def test_coalesced_move_is_flushed_when_the_hand_leaves():
+    _, pts, _ = SyntheticHandSource(frames=2, seed=0).landmark_track()
+    clock = VirtualClock()
+    backend = RecordingBackend(max_rate_hz=10, clock=clock)
+    recognizer, source = make_recognizer(backend, clock)
+
+    for seq, dt in enumerate((0.0, 0.01), 1):
+        clock.advance(dt)
+        source.current = [pts[0] + 0.05 * seq]
+        recognizer.process_frame(seq, FRAME, clock.now())
+    assert backend.pending is not None
+
+    clock.advance(0.01)
+    source.current = []
+    recognizer.process_frame(3, FRAME, clock.now())
+    assert backend.pending is None
+    assert len(backend.moves()) == 2
+
+
+def test_published_hands_are_not_changed_by_later_frames():
+    _, pts, _ = SyntheticHandSource(frames=2, seed=0).landmark_track()
+    clock = VirtualClock()
+    recognizer, source = make_recognizer(RecordingBackend(clock=clock), clock)
+
+    source.current = [pts[0]]
+    recognizer.process_frame(1, FRAME, clock.now())
+    seq, hands = recognizer.latest_hands
+    before = hands[0].copy()
+
+    clock.advance(1 / 30)
+    source.current = [pts[0] + 0.1]
+    recognizer.process_frame(2, FRAME, clock.now())
+    assert seq == 1 and np.array_equal(hands[0], before)
+    assert not np.array_equal(recognizer.latest_hands[1][0], before)
@@ -0,0 +1,47 @@
+from clock import VirtualClock
+from input_backends import RecordingBackend
+
+
+def make_backend(**kwargs):
+    clock = VirtualClock()
+    return RecordingBackend(clock=clock, **kwargs), clock
+
+
+def test_moves_below_threshold_are_dropped():
+    backend, _ = make_backend(min_move_px=3)
+    assert backend.move_to(100, 100)
+    assert not backend.move_to(102, 101)
+    assert backend.move_to(103, 100)
+    assert [(x, y) for _, x, y in backend.moves()] == [(100, 100), (103, 100)]
+    assert backend.moves_sent == 2 and backend.moves_dropped == 1
+
+
+def test_fast_moves_are_coalesced_to_the_newest():
+    backend, clock = make_backend(max_rate_hz=100)
+    backend.move_to(0, 0)
+    clock.advance(0.002)
+    assert not backend.move_to(10, 0)
+    clock.advance(0.002)
+    assert not backend.move_to(20, 0)
+    assert backend.pending == (20, 0)
+    clock.advance(0.010)
+    assert backend.move_to(30, 0)
+    assert [(x, y) for _, x, y in backend.moves()] == [(0, 0), (30, 0)]
+    assert backend.pending is None
+
+
+def test_pending_move_is_flushed_before_a_button():
+    backend, clock = make_backend(max_rate_hz=100)
+    backend.move_to(0, 0)
+    clock.advance(0.001)
+    backend.move_to(50, 60)
+    backend.click()
+    kinds = [(kind, x, y) for _, kind, x, y, _ in backend.events]
+    assert kinds == [('move', 0, 0), ('move', 50, 60), ('down', 50, 60), ('up', 50, 60)]
+
+
+def test_flush_without_pending_move_does_nothing():
+    backend, _ = make_backend()
+    backend.move_to(5, 5)
+    backend.flush()
+    assert len(backend.moves()) == 1
@@ -0,0 +1,31 @@
+import pytest
+
+from overlay import RepaintGate
+
+
+def test_each_frame_is_painted_once():
+    gate = RepaintGate()
+    assert not gate.pending()
+    gate.notify(1)
+    assert gate.pending()
+    assert gate.take(1, 0.0)
+    assert not gate.pending()
+    assert not gate.take(1, 0.1)
+
+
+def test_only_the_newest_frame_is_painted():
+    gate = RepaintGate()
+    gate.notify(1)
+    gate.notify(2)
+    gate.notify(3)
+    assert gate.take(gate.latest, 0.0)
+    assert gate.painted == 3
+    assert not gate.take(2, 0.01)
+
+
+def test_wait_paces_repaints_by_min_interval():
+    gate = RepaintGate()
+    gate.notify(1)
+    gate.take(1, 1.0)
+    assert gate.wait(0.1, 1.04) == pytest.approx(0.06)
+    assert gate.wait(0.1, 1.2) == 0.0
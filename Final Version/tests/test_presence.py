@@ -0,0 +1,48 @@
+import numpy as np
+
+from presence import PresenceDetector
+
+BLANK = np.full((90, 160, 3), 60, dtype=np.uint8)
+
+
+def skin_patch(x):
+    frame = BLANK.copy()
+    frame[30:60, x:x + 20] = (120, 160, 220)   # BGR skin tone
+    return frame
+
+
+def test_still_blank_frames_are_gated():
+    det = PresenceDetector(force_interval=10.0)
+    assert det.should_infer(BLANK, 0.0, False)      # no reference yet
+    assert [det.should_infer(BLANK, 0.1 * i, False) for i in range(1, 5)] == [False] * 4
+
+
+def test_moving_skin_passes_and_tracking_always_passes():
+    det = PresenceDetector(force_interval=10.0)
+    det.should_infer(skin_patch(20), 0.0, False)
+    assert det.should_infer(skin_patch(60), 0.1, False)
+    assert det.should_infer(BLANK, 0.2, True)
+
+
+def test_forced_pickups_of_a_still_hand_do_not_open_the_gate():
+    det = PresenceDetector(force_interval=0.5)
+    det.should_infer(BLANK, 0.0, False)
+    for i in range(1, 100):
+        if det.should_infer(BLANK, 0.5 * i, False):
+            det.learn()      # a still hand found on the forced frame
+    assert det.threshold == det.min_threshold
+    assert det.n_scores == 0
+    now = 0.5 * 99
+    assert [det.should_infer(BLANK, now + 0.1 * i, False) for i in range(1, 5)] == [False] * 4
+    assert det.gate_ratio() > 0.0
+
+
+def test_threshold_is_learned_from_hands_that_passed_on_score():
+    det = PresenceDetector(force_interval=10.0)
+    det.should_infer(BLANK, 0.0, False)
+    for i in range(40):
+        det.should_infer(skin_patch(20 + 40 * (i % 2)), 0.1 * (i + 1), False)
+        if det.last_on_score:
+            det.learn()
+    assert det.n_scores >= 32
+    assert det.min_threshold < det.threshold <= det.last_score
@@ -0,0 +1,74 @@
+import json
+import threading
+
+import pytest
+
+from profiling import StageTimer, Tracer, bucket_upper
+
+
+def test_disabled_timer_records_nothing():
+    timer = StageTimer()
+    t = timer.lap("decode", 0.0)
+    assert t > 0.0
+    assert timer.summary() == {}
+
+
+def test_percentiles_are_bucket_upper_bounds():
+    timer = StageTimer(enabled=True)
+    for _ in range(90):
+        timer.add("process", 0.001)
+    for _ in range(10):
+        timer.add("process", 0.1)
+    s = timer.summary()["process"]
+    assert s["count"] == 100
+    assert s["mean_ms"] == pytest.approx(10.9)
+    # buckets are about 19 % wide, and a percentile reports the upper edge
+    assert 1.0 <= s["p50_ms"] < 1.2
+    assert 100.0 <= s["p99_ms"] < 120.0
+
+
+def test_out_of_range_durations_land_in_the_end_buckets():
+    timer = StageTimer(enabled=True)
+    timer.add("gate", 1e-7)
+    timer.add("gate", 100.0)
+    counts = timer.counts["gate"]
+    assert counts[0] == 1 and counts[-1] == 1
+    assert timer.percentile("gate", 1.0) == bucket_upper(len(counts) - 1)
+
+
+def test_unknown_stages_get_their_own_histogram():
+    timer = StageTimer(enabled=True)
+    timer.add("custom", 0.002)
+    assert timer.summary()["custom"]["count"] == 1
+    timer.reset()
+    assert timer.summary() == {}
+
+
+def test_timer_feeds_an_enabled_tracer_even_when_disabled():
+    tracer = Tracer(capacity=8, enabled=True)
+    timer = StageTimer(tracer=tracer)
+    timer.lap("decode", 0.0, seq=7)
+    (event, meta) = tracer.events()
+    assert event["name"] == "decode" and event["ph"] == "X"
+    assert event["args"] == {"frame": 7}
+    assert meta["ph"] == "M" and meta["tid"] == threading.get_ident()
+
+
+def test_tracer_keeps_the_newest_events_in_time_order():
+    tracer = Tracer(capacity=4, enabled=True)
+    for i in range(10):
+        tracer.record("process", tracer.origin + i, tracer.origin + i + 0.5, seq=i)
+    spans = [e for e in tracer.events() if e["ph"] == "X"]
+    assert [e["args"]["frame"] for e in spans] == [6, 7, 8, 9]
+    assert spans[0]["ts"] == pytest.approx(6e6)
+    assert spans[0]["dur"] == pytest.approx(5e5)
+
+
+def test_tracer_export_is_chrome_trace_json(tmp_path):
+    tracer = Tracer(capacity=4, enabled=True)
+    tracer.record("my_stage", tracer.origin, tracer.origin + 0.001)
+    path = tmp_path / "trace.json"
+    tracer.export(str(path))
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["displayTimeUnit"] == "ms"
+    assert data["traceEvents"][0]["name"] == "my_stage"
@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pytest
+
+import recorder
+from recorder import SessionRecorder, load_meta, make_recorder, read_session, session_times
+
+
+def frames(n):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (24, 32, 3), dtype=np.uint8) for _ in range(n)]
+
+
+def test_png_session_round_trips_exactly(tmp_path):
+    path = str(tmp_path / "session")
+    rec = SessionRecorder(path, {"camera": {"fps": 30}}, codec="png", quality=1, chunk_frames=4)
+    sent = frames(10)
+    for i, frame in enumerate(sent):
+        assert rec.offer(i + 1, 100.0 + i / 30, frame)
+    rec.close()
+
+    got = list(read_session(path))
+    assert [seq for _, seq, _ in got] == list(range(1, 11))
+    assert all(np.array_equal(a, b) for a, (_, _, b) in zip(sent, got))
+    assert np.allclose([t for t, _, _ in got], np.arange(10) / 30)
+    assert np.allclose(session_times(path), np.arange(10) / 30)
+
+    meta = load_meta(path)
+    assert meta["chunks"] == 3 and meta["frames_written"] == 10
+    assert meta["config"] == {"camera": {"fps": 30}}
+    assert not [n for n in os.listdir(path) if n.endswith(".tmp")]
+
+
+def test_jpeg_session_decodes_to_the_recorded_shape(tmp_path):
+    path = str(tmp_path / "session")
+    rec = SessionRecorder(path, codec="jpeg", quality=90)
+    rec.offer(1, 0.0, frames(1)[0])
+    rec.close()
+    (_, seq, frame), = read_session(path)
+    assert seq == 1 and frame.shape == (24, 32, 3)
+
+
+def test_offers_after_close_are_refused(tmp_path):
+    path = str(tmp_path / "session")
+    rec = SessionRecorder(path)
+    rec.close()
+    assert not rec.offer(1, 0.0, frames(1)[0])
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        assert json.load(f)["frames_offered"] == 0
+
+
+def test_full_queue_drops_and_counts_frames(tmp_path, monkeypatch):
+    encoding, release = threading.Event(), threading.Event()
+    imencode = recorder.cv2.imencode
+
+    def slow_imencode(*args):
+        encoding.set()
+        release.wait(5)
+        return imencode(*args)
+
+    monkeypatch.setattr(recorder.cv2, "imencode", slow_imencode)
+    path = str(tmp_path / "session")
+    rec = SessionRecorder(path, queue_frames=2)
+    sent = frames(6)
+    assert rec.offer(1, 0.0, sent[0])
+    assert encoding.wait(5)          # the writer is now stuck on frame 1
+    accepted = [rec.offer(i + 1, i / 30, f) for i, f in enumerate(sent[1:], 1)]
+    assert accepted == [True, True, False, False, False]
+    release.set()
+    rec.close()
+
+    assert (rec.offered, rec.dropped, rec.written) == (6, 3, 3)
+    assert [seq for _, seq, _ in read_session(path)] == [1, 2, 3]
+    meta = load_meta(path)
+    assert meta["frames_dropped"] == 3 and meta["frames_written"] == 3
+
+
+def test_sessions_started_in_one_second_get_their_own_directories(tmp_path):
+    cfg = {"directory": str(tmp_path)}
+    recs = [make_recorder(cfg, {}) for _ in range(3)]
+    for rec in recs:
+        rec.close()
+    assert len({rec.path for rec in recs}) == 3
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_recorder_refuses_an_existing_directory(tmp_path):
+    with pytest.raises(FileExistsError):
+        SessionRecorder(str(tmp_path))
@@ -0,0 +1,39 @@
+import pytest
+
+from input_backends import RecordingBackend
+from screen_mapping import ScreenMapper
+
+
+def make_mapper(region=(0.0, 0.0, 1.0, 1.0)):
+    return ScreenMapper(RecordingBackend(screen_size=(1920, 1080)), region)
+
+
+def test_full_region_maps_linearly():
+    mapper = make_mapper()
+    assert mapper.map(0.5, 0.5) == pytest.approx((960, 540))
+    assert mapper.map(0.25, 0.75) == pytest.approx((480, 810))
+
+
+def test_active_region_is_stretched_over_the_screen():
+    mapper = make_mapper((0.2, 0.1, 0.8, 0.9))
+    assert mapper.map(0.5, 0.5) == pytest.approx((960, 540))
+    assert mapper.map(0.35, 0.3) == pytest.approx((480, 270))
+
+
+def test_clamp_stays_off_the_fail_safe_corners():
+    mapper = make_mapper((0.2, 0.2, 0.8, 0.8))
+    assert mapper.map(-1.0, -1.0) == (1, 1)
+    assert mapper.map(0.0, 0.0) == (1, 1)
+    assert mapper.map(2.0, 2.0) == (1918, 1078)
+
+
+def test_calibrate_fits_the_samples_with_a_margin():
+    mapper = make_mapper()
+    region = mapper.calibrate([0.3, 0.5, 0.7], [0.2, 0.6], margin=0.05)
+    assert region == pytest.approx((0.25, 0.15, 0.75, 0.65))
+    assert mapper.map(0.25, 0.15) == (1, 1)
+
+
+def test_calibrate_ignores_a_sweep_that_is_too_small():
+    mapper = make_mapper((0.1, 0.1, 0.9, 0.9))
+    assert mapper.calibrate([0.5, 0.51], [0.5, 0.5], margin=0.0) == (0.1, 0.1, 0.9, 0.9)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from smoothing import LandmarkFilter, ema_alpha
+
+
+def test_ema_alpha_matches_the_factor_at_reference_rate():
+    assert ema_alpha(0.8, 1 / 30) == pytest.approx(0.8)
+    assert ema_alpha(1.0, 0.5) == 1.0
+
+
+def test_ema_alpha_is_frame_rate_independent():
+    # three steps at 30 FPS decay as much as one step at 10 FPS
+    per_frame = ema_alpha(0.4, 1 / 30)
+    assert 1 - ema_alpha(0.4, 1 / 10) == pytest.approx((1 - per_frame) ** 3)
+
+
+def test_landmark_filter_passes_the_first_frame_through():
+    pts = np.random.default_rng(0).random((21, 3))
+    f = LandmarkFilter()
+    assert np.array_equal(f(pts, 0.0), pts)
+
+
+def test_landmark_filter_smooths_jitter_and_follows_motion():
+    rng = np.random.default_rng(1)
+    base = np.full((21, 3), 0.5)
+    f = LandmarkFilter(min_cutoff=1.0, beta=0.0)
+    f(base, 0.0)
+    out = [f(base + rng.normal(0, 0.01, base.shape), i / 30).copy() for i in range(1, 60)]
+    assert np.std(np.array(out) - base) < 0.005
+
+    fast = LandmarkFilter(min_cutoff=1.0, beta=10.0)
+    fast(base, 0.0)
+    for i in range(1, 10):
+        moved = fast(base + 0.02 * i, i / 30)
+    assert moved[0, 0] > base[0, 0] + 0.1
+
+
+def test_landmark_filter_reset_and_repeated_timestamp():
+    f = LandmarkFilter()
+    a = np.zeros((21, 3))
+    f(a, 1.0)
+    assert np.array_equal(f(a + 1, 1.0), a)
+    f.reset()
+    assert np.array_equal(f(a + 1, 2.0), a + 1)
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from frame_sources import SyntheticHandSource
+from tool_config import load_config, parse_size
+
+
+def test_missing_config_is_empty(tmp_path):
+    assert load_config(str(tmp_path / "missing.json")) == {}
+    assert load_config(None, pinned=True) == {"performance": {"cpu_percent": None, "frame_ms": None}}
+
+
+def test_pinned_config_switches_off_the_budget_governor(tmp_path):
+    path = tmp_path / "session_config.json"
+    path.write_text(json.dumps({"performance": {"cpu_percent": 60, "start_level": 2}}), encoding="utf-8")
+    assert load_config(str(path))["performance"]["cpu_percent"] == 60
+    perf = load_config(str(path), pinned=True)["performance"]
+    assert perf == {"cpu_percent": None, "frame_ms": None, "start_level": 2}
+
+
+def test_parse_size():
+    assert parse_size("1920x1080") == (1920, 1080)
+    assert parse_size("640X480") == (640, 480)
+
+
+def test_synthetic_hand_rejects_a_size_where_pinches_overlap():
+    with pytest.raises(ValueError):
+        SyntheticHandSource(frames=1, hand_size=0.05)
+    SyntheticHandSource(frames=1, hand_size=0.15)
@@ -0,0 +1,27 @@
+import json
+import os
+
+
+def load_config(path, pinned=False):
+    """
+    session_config.json (or {} if there is none) for the offline tools.
+
+    pinned switches off the CPU / frame-time budget governor: a governor
+    that changes quality mid-run would make two measurements or two
+    replays of one recording incomparable.
+    """
+    cfg = {}
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    if pinned:
+        perf = cfg.setdefault("performance", {})
+        perf["cpu_percent"] = None
+        perf["frame_ms"] = None
+    return cfg
+
+
+def parse_size(text):
+    """"1920x1080" → (1920, 1080)."""
+    w, h = text.lower().split("x")
+    return int(w), int(h)
@@ -0,0 +1,112 @@
+"""
+Train the optional gesture-pose classifier from labelled landmark
+recordings (save_landmarks files with "none" / "left" / "right" labels).
+
+    python train_classifier.py --landmarks a.npz b.npz          # → gesture_model.npz
+    python train_classifier.py --model knn --out gesture_knn.npz
+    python train_classifier.py                                   # synthetic hand
+
+The last --holdout of every recording is kept for validation (by time, so
+neighbouring frames do not leak into it). To use the model set in
+session_config.json:  "gestures": {"detector": "classifier" or "both",
+"model_file": "gesture_model.npz"}.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from classifier import MODELS, PoseClassifier, hand_features, load_classifier, save_classifier
+from frame_sources import SyntheticHandSource, landmarks_aspect, load_landmarks
+
+CLASSES = ("none", "left", "right")
+
+
+def load_recordings(args):
+    """[(t, pts, labels, frame aspect)]"""
+    if not args.landmarks:
+        # two independent synthetic runs, one per split
+        recs = []
+        for s, size in ((args.seed, 0.15), (args.seed + 1, 0.12)):
+            src = SyntheticHandSource(frames=int(args.seconds * 30), seed=s, hand_size=size)
+            recs.append(src.landmark_track() + (src.aspect,))
+        return recs
+    recs = []
+    for path in args.landmarks:
+        t, pts, labels = load_landmarks(path)
+        if labels is None:
+            raise SystemExit(f"{path} has no labels")
+        recs.append((t, pts, labels, landmarks_aspect(path)))
+    return recs
+
+
+def split(recs, holdout):
+    train, test = [], []
+    for _, pts, labels, aspect in recs:
+        keep = ~np.isnan(pts[:, 0, 0])
+        X = hand_features(pts[keep], aspect)
+        y = np.array([CLASSES.index(str(l)) for l in np.asarray(labels)[keep]])
+        cut = int(len(y) * (1 - holdout))
+        train.append((X[:cut], y[:cut]))
+        test.append((X[cut:], y[cut:]))
+    join = lambda parts: (np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]))
+    return join(train), join(test)
+
+
+def confusion(y_true, y_pred):
+    m = np.zeros((len(CLASSES), len(CLASSES)), dtype=np.int64)
+    np.add.at(m, (y_true, y_pred), 1)
+    return m
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Train the gesture-pose classifier")
+    ap.add_argument("--landmarks", nargs="*", help="labelled landmark recordings (.npz)")
+    ap.add_argument("--seconds", type=float, default=300.0, help="length of each synthetic recording")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--model", choices=tuple(MODELS), default="mlp")
+    ap.add_argument("--hidden", type=int, default=32, help="MLP hidden units")
+    ap.add_argument("--epochs", type=int, default=400)
+    ap.add_argument("--k", type=int, default=5, help="k-NN neighbours")
+    ap.add_argument("--holdout", type=float, default=0.2)
+    ap.add_argument("--out", default="gesture_model.npz")
+    args = ap.parse_args()
+
+    recs = load_recordings(args)
+    (X, y), (Xt, yt) = split(recs, args.holdout)
+    print(f"train {len(y)} frames, validation {len(yt)}   "
+          + "  ".join(f"{c}: {int((y == i).sum())}" for i, c in enumerate(CLASSES)))
+
+    if args.model == "mlp":
+        model = MODELS["mlp"](CLASSES, hidden=args.hidden, seed=args.seed)
+    else:
+        model = MODELS["knn"](CLASSES, k=args.k, seed=args.seed)
+    model.aspect = recs[0][3]
+    t0 = time.perf_counter()
+    model.fit(X, y, epochs=args.epochs)
+    print(f"trained in {time.perf_counter() - t0:.1f} s")
+
+    m = confusion(yt, model.predict(Xt))
+    print(f"validation accuracy {np.trace(m) / m.sum():.4f}   rows true, columns predicted")
+    print(f"{'':>8}" + "".join(f"{c:>8}" for c in CLASSES))
+    for c, row in zip(CLASSES, m):
+        print(f"{c:>8}" + "".join(f"{v:>8}" for v in row))
+
+    save_classifier(args.out, model)
+    # per-frame cost as the engine pays it, through the saved file
+    pose = PoseClassifier(load_classifier(args.out))
+    sample = Xt[:1] if len(Xt) else X[:1]
+    frames = recs[0][1][:500]
+    frames = frames[~np.isnan(frames[:, 0, 0])]
+    t0 = time.perf_counter()
+    for pts in frames:
+        pose(pts, recs[0][3])
+    per_frame = (time.perf_counter() - t0) / max(len(frames), 1)
+    t0 = time.perf_counter()
+    model.predict(np.repeat(sample, 10000, axis=0))
+    batched = (time.perf_counter() - t0) / 10000
+    print(f"saved {args.out}   {per_frame * 1e6:.0f} µs per frame, {batched * 1e6:.2f} µs per frame batched")
+
+
+if __name__ == "__main__":
+    main()
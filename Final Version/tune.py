@@ -0,0 +1,274 @@
+"""
+Gesture-threshold grid search over labelled landmark recordings.
+
+The pinch state machine of HandGestureRecognizer.detect_gestures (pinch
+distance, debounce, click/hold split) is run over every combination of a
+parameter grid at once: each frame advances all combinations together as
+NumPy arrays, so thousands of settings cost about as much as a handful.
+
+    python tune.py                                    # 5 min synthetic hand
+    python tune.py --landmarks a.npz b.npz --pinch 0.02:0.06:0.002 --top 20
+    python tune.py --rules palm --out tuning.json
+
+Recordings are save_landmarks files with per-frame labels "none", "left"
+(thumb to middle finger) or "right" (thumb to ring finger). A click or
+mouse-down counts as a hit when it falls inside a labelled pinch (or up to
+--tolerance after it ends, since clicks fire on release). Reported per
+button: precision, recall and the delay from pinch onset to the event.
+
+--rules palm swaps the fixed distance for the palm-size relative test of
+Inzynierka_.detect_gesture: thumb-to-tip closer than palm * pinch factor
+while the other pinch finger stays extended (tip-to-MCP beyond palm * fold
+factor), palm being wrist to middle-finger MCP.
+"""
+import argparse
+import json
+
+import numpy as np
+
+from frame_sources import SyntheticHandSource, landmarks_aspect, load_landmarks
+from smoothing import LandmarkFilter
+from tool_config import load_config
+
+BUTTONS = ("left", "right")
+TIPS = {"left": 12, "right": 16}          # detect_gestures: middle → left, ring → right
+OTHER = {"left": (16, 13), "right": (12, 9)}   # the other pinch finger, tip and MCP
+
+GRIDS = {
+    "engine": ("pinch", "debounce", "hold"),
+    "palm": ("pinch_factor", "fold_factor", "debounce", "hold"),
+}
+DEFAULTS = {
+    "pinch": "0.02:0.06:0.0025",
+    "pinch_factor": "0.2:0.7:0.05",
+    "fold_factor": "0.4:1.0:0.1",
+    "debounce": "0:0.15:0.025",
+    "hold": "0.3:0.8:0.1",
+}
+# engine defaults; the config's gestures section overrides pinch, debounce and hold
+CURRENT = {"pinch": 0.04, "debounce": 0.05, "hold": 0.5,
+           "pinch_factor": 0.5, "fold_factor": 0.7}
+
+
+def parse_range(text):
+    """"a:b:step" (inclusive) or "x,y,z" → array."""
+    if ":" in text:
+        a, b, step = (float(v) for v in text.split(":"))
+        return np.round(np.arange(a, b + step / 2, step), 6)
+    return np.array([float(v) for v in text.split(",")])
+
+
+def make_grid(names, axes):
+    mesh = np.meshgrid(*[axes[n] for n in names], indexing="ij")
+    return {n: m.ravel() for n, m in zip(names, mesh)}
+
+
+def filtered(t, pts, gest_cfg):
+    """The landmarks detect_gestures sees: One Euro filtered, reset on gaps."""
+    f = LandmarkFilter(gest_cfg.get("landmark_min_cutoff", 2.0), gest_cfg.get("landmark_beta", 10.0))
+    out = np.full_like(pts, np.nan)
+    for i in range(len(t)):
+        if np.isnan(pts[i, 0, 0]):
+            f.reset()
+        else:
+            out[i] = f(pts[i], t[i])
+    return out
+
+
+def features(pts, rules, aspect):
+    """Per-frame distances the rules compare against thresholds, (N,) each."""
+    def dist(a, b):
+        d = pts[:, a, :2] - pts[:, b, :2]
+        if rules == "palm":
+            d = d * (aspect, 1.0)   # the legacy rules measure in pixels
+        return np.hypot(d[:, 0], d[:, 1])
+
+    feats = {"present": ~np.isnan(pts[:, 0, 0])}
+    for b in BUTTONS:
+        feats[b] = dist(4, TIPS[b])
+        if rules == "palm":
+            feats[b + "_other"] = dist(*OTHER[b])
+    if rules == "palm":
+        feats["palm"] = dist(0, 9)
+    return feats
+
+
+def segments(labels, t, button, tolerance):
+    """Per-frame index of the labelled pinch a press there would belong to
+    (-1 if none), and each pinch's onset time."""
+    on = labels == button
+    starts = np.flatnonzero(on & ~np.r_[False, on[:-1]])
+    ends = np.flatnonzero(on & ~np.r_[on[1:], False])
+    seg = np.full(len(t), -1)
+    for k, (s, e) in enumerate(zip(starts, ends)):
+        window = (t >= t[s]) & (t <= t[e] + tolerance) & (seg < 0)
+        seg[window] = k
+    return seg, t[starts]
+
+
+class PinchState:
+    """detect_gestures' per-button pinch state for P parameter sets."""
+
+    def __init__(self, p):
+        self.since = np.full(p, np.nan)
+        self.active = np.zeros(p, dtype=bool)
+        self.holding = np.zeros(p, dtype=bool)
+        self.start = np.zeros(p)
+
+    def step(self, cond, now, debounce, hold, mask=None):
+        """Advance where mask is set; returns the presses (click or mouse-down)."""
+        if mask is not None:
+            cond_on, cond_off = cond & mask, ~cond & mask
+        else:
+            cond_on, cond_off = cond, ~cond
+        self.since = np.where(cond_on & np.isnan(self.since), now, self.since)
+        ready = cond_on & (now - self.since >= debounce)
+        begin = ready & ~self.active
+        down = ready & self.active & ~self.holding & (now - self.start > hold)
+        self.start = np.where(begin, now, self.start)
+        self.active |= begin
+        self.holding |= down
+
+        release = cond_off & self.active
+        click = release & (now - self.start <= hold)
+        self.active &= ~cond_off
+        self.holding &= ~cond_off
+        self.since = np.where(cond_off, np.nan, self.since)
+        return down | click
+
+
+def evaluate(t, feats, labels, grid, rules, tolerance):
+    """Counts per button for every grid point: presses, hits, pinches and
+    summed onset → press delay."""
+    p = len(grid["debounce"])
+    states = {b: PinchState(p) for b in BUTTONS}
+    segs = {b: segments(labels, t, b, tolerance) for b in BUTTONS}
+    hit = {b: np.zeros((p, len(segs[b][1])), dtype=bool) for b in BUTTONS}
+    out = {b: {"presses": np.zeros(p, dtype=np.int64), "hits": np.zeros(p, dtype=np.int64),
+               "delay": np.zeros(p), "pinches": len(segs[b][1])} for b in BUTTONS}
+
+    for i in np.flatnonzero(feats["present"]):
+        now = t[i]
+        if rules == "palm":
+            palm = feats["palm"][i]
+            cond = {b: (feats[b][i] < grid["pinch_factor"] * palm) &
+                       (feats[b + "_other"][i] > grid["fold_factor"] * palm) for b in BUTTONS}
+        else:
+            cond = {b: feats[b][i] < grid["pinch"] for b in BUTTONS}
+
+        # a held left pinch returns before the right one is looked at
+        presses = {"left": states["left"].step(cond["left"], now, grid["debounce"], grid["hold"])}
+        presses["right"] = states["right"].step(cond["right"], now, grid["debounce"], grid["hold"],
+                                                mask=~cond["left"])
+        for b in BUTTONS:
+            pressed = presses[b]
+            if not pressed.any():
+                continue
+            o = out[b]
+            o["presses"] += pressed
+            k = segs[b][0][i]
+            if k >= 0:
+                first = pressed & ~hit[b][:, k]
+                hit[b][:, k] |= pressed
+                o["hits"] += first
+                o["delay"] += np.where(first, now - segs[b][1][k], 0.0)
+    return out
+
+
+def combine(results):
+    total = results[0]
+    for r in results[1:]:
+        for b in BUTTONS:
+            for key in ("presses", "hits", "delay", "pinches"):
+                total[b][key] = total[b][key] + r[b][key]
+    return total
+
+
+def scores(counts, minutes):
+    out = {}
+    for b in BUTTONS:
+        c = counts[b]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            precision = np.where(c["presses"] > 0, c["hits"] / c["presses"], 0.0)
+            recall = c["hits"] / c["pinches"] if c["pinches"] else np.zeros_like(precision)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+            delay = np.where(c["hits"] > 0, c["delay"] / c["hits"], np.nan)
+        out[b] = {"precision": precision, "recall": recall, "f1": f1, "delay_ms": 1000 * delay,
+                  "false_per_min": (c["presses"] - c["hits"]) / minutes}
+    return out
+
+
+def load_recordings(args):
+    """[(t, pts, labels, frame aspect)] — --aspect overrides the recordings'."""
+    if not args.landmarks:
+        src = SyntheticHandSource(frames=int(args.seconds * 30), seed=args.seed)
+        return [src.landmark_track() + (args.aspect or src.aspect,)]
+    recs = []
+    for path in args.landmarks:
+        t, pts, labels = load_landmarks(path)
+        if labels is None:
+            raise SystemExit(f"{path} has no labels")
+        recs.append((t, pts, labels, args.aspect or landmarks_aspect(path)))
+    return recs
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Gesture threshold grid search")
+    ap.add_argument("--landmarks", nargs="*", help="labelled landmark recordings (.npz)")
+    ap.add_argument("--seconds", type=float, default=300.0, help="length of the synthetic recording")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--rules", choices=tuple(GRIDS), default="engine")
+    ap.add_argument("--config", default="session_config.json")
+    ap.add_argument("--aspect", type=float,
+                    help="camera width / height for the palm rules (default: the recording's)")
+    ap.add_argument("--tolerance", type=float, default=0.3, help="s after a pinch a press still counts")
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--out", help="save every grid point's scores as JSON")
+    for name, default in DEFAULTS.items():
+        ap.add_argument("--" + name.replace("_", "-"), default=default, help="a:b:step or list")
+    args = ap.parse_args()
+
+    names = GRIDS[args.rules]
+    gest_cfg = load_config(args.config).get("gestures", {})
+    current_values = dict(CURRENT, pinch=gest_cfg.get("pinch_threshold", CURRENT["pinch"]),
+                          debounce=gest_cfg.get("debounce_ms", CURRENT["debounce"] * 1000) / 1000.0,
+                          hold=gest_cfg.get("hold_s", CURRENT["hold"]))
+    axes = {n: parse_range(getattr(args, n)) for n in names}
+    for n in names:   # always include the configured value
+        axes[n] = np.union1d(axes[n], [current_values[n]])
+    grid = make_grid(names, axes)
+
+    results, minutes = [], 0.0
+    for t, pts, labels, aspect in load_recordings(args):
+        pts = filtered(t, pts, gest_cfg)
+        results.append(evaluate(t, features(pts, args.rules, aspect), np.asarray(labels),
+                                grid, args.rules, args.tolerance))
+        minutes += (t[-1] - t[0]) / 60.0
+    s = scores(combine(results), minutes)
+
+    mean_f1 = (s["left"]["f1"] + s["right"]["f1"]) / 2
+    mean_delay = np.nan_to_num((s["left"]["delay_ms"] + s["right"]["delay_ms"]) / 2, nan=1e9)
+    order = np.lexsort((mean_delay, -mean_f1))
+    current = np.flatnonzero(np.all([np.isclose(grid[n], current_values[n]) for n in names], axis=0))
+
+    print(f"{len(mean_f1)} combinations over {minutes:.1f} min of landmarks")
+    header = "".join(f"{n:>13}" for n in names)
+    print(f"{'':>4}{header}" + "".join(f"{b + ' P/R':>14}{'delay':>8}{'false/min':>10}" for b in BUTTONS))
+    for rank, i in enumerate(list(order[:args.top]) + list(current)):
+        tag = "now" if i in current else f"{rank + 1:>3}"
+        row = "".join(f"{grid[n][i]:>13.4g}" for n in names)
+        for b in BUTTONS:
+            x = s[b]
+            row += f"{x['precision'][i]:>8.2f}/{x['recall'][i]:<5.2f}{x['delay_ms'][i]:>8.0f}{x['false_per_min'][i]:>10.2f}"
+        print(f"{tag:>4}{row}")
+
+    if args.out:
+        rows = [{**{n: float(grid[n][i]) for n in names},
+                 **{f"{b}_{k}": float(v[i]) for b in BUTTONS for k, v in s[b].items()}}
+                for i in order]
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"rules": args.rules, "minutes": minutes, "results": rows}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,19 @@
 import sys
-import math
 import tkinter as tk
 import json
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import ctypes
-import cv2
-from threading import Thread
-import mediapipe as mp
-import pyautogui as pg
 import win32gui
 import win32con
 import time
 
+from hand_engine import WebcamStream, build_recognizer
+from input_backends import make_backend
+from overlay import (CursorMarker, RepaintGate, SkeletonOverlay, draw_hands, make_renderer,
+                     pip_geometry)
+from profiling import StageTimer, Tracer, install_dump_signal
+from recorder import make_recorder
+
 # PyQt5 imports for completeness (we no longer show the ActionCircle)
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt
@@ -19,212 +21,27 @@ from PyQt5.QtCore import Qt
 # Initialize a Qt app so nothing breaks if someone still instantiates the circle
 qt_app = QApplication(sys.argv)
 
+# Qt events, the maximize gesture and display changes are polled this
+# often; the camera image itself only when a new frame has arrived, which
+# is checked (a number comparison) every OVERLAY_POLL_MS
+HOUSEKEEPING_MS = 50
+OVERLAY_POLL_MS = 5
 
-class WebcamStream:
-    def __init__(self, src=0, width=1280, height=720):
-        self.cap = cv2.VideoCapture(src)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        self.ret, self.frame = self.cap.read()
-        self.stopped = False
-
-    def start(self):
-        Thread(target=self.update, daemon=True).start()
-        return self
-
-    def update(self):
-        while not self.stopped:
-            self.ret, self.frame = self.cap.read()
-
-    def read(self):
-        return self.frame
 
-    def stop(self):
-        self.stopped = True
-        self.cap.release()
-
-
-def make_window_clickthrough(hwnd, alpha):
+def make_window_clickthrough(hwnd, alpha, black_transparent=False, clickthrough=True):
     WS_EX_LAYERED     = 0x80000
     WS_EX_TRANSPARENT = 0x20
     GWL_EXSTYLE       = -20
+    LWA_COLORKEY      = 0x1
     LWA_ALPHA         = 0x2
     styles = ctypes.windll.user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
-    ctypes.windll.user32.SetWindowLongW(
-        hwnd, GWL_EXSTYLE, styles | WS_EX_LAYERED | WS_EX_TRANSPARENT
-    )
-    ctypes.windll.user32.SetLayeredWindowAttributes(hwnd, 0, alpha, LWA_ALPHA)
-
-
-def resize_active_window(new_width, new_height):
-    hwnd = win32gui.GetForegroundWindow()
-    if not hwnd:
-        return
-    left, top, right, bottom = win32gui.GetWindowRect(hwnd)
-    win32gui.SetWindowPos(
-        hwnd, None,
-        left, top,
-        new_width, new_height,
-        win32con.SWP_NOZORDER | win32con.SWP_NOOWNERZORDER
-    )
-
-
-class HandGestureRecognizer:
-    def __init__(self, stream):
-        self.stream = stream
-
-        # Default — overridden in main()
-        self.hands = mp.solutions.hands.Hands(
-            static_image_mode=False,
-            model_complexity=1,
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7
-        )
-
-        # Cursor smoothing state
-        self.prev_x, self.prev_y = 0, 0
-        self.smooth_factor = 0.8
-
-        # Thread control & gesture flags
-        self.running = True
-        self.cooldown_end = 0
-        self.show_resize_flag = False
-
-        # Left-click pinch state
-        self.left_frame_count = 0
-        self.left_active = False
-        self.left_holding = False
-        self.left_start = None
-
-        # Right-click pinch state
-        self.right_frame_count = 0
-        self.right_active = False
-        self.right_holding = False
-        self.right_start = None
-
-        # Drag‑resize state
-        self.resizing = False
-        self.initial_hand_x = None
-        self.initial_win_w = None
-        self.initial_win_h = None
-
-    def start(self):
-        Thread(target=self.run, daemon=True).start()
-
-    def run(self):
-        while self.running:
-            frame = self.stream.read()
-            if frame is None:
-                continue
-
-            frame = cv2.flip(frame, 1)
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(rgb)
-            now = time.time()
-
-            if results.multi_hand_landmarks:
-                lm = results.multi_hand_landmarks
-                # move cursor
-                if not self.resizing:
-                    ix, iy = self.smooth_cursor(lm[0].landmark[8], pg.size())
-                    pg.moveTo(ix, iy)
-                # detect all gestures
-                self.detect_gestures(lm, now)
-
-            time.sleep(0.01)
-
-    def smooth_cursor(self, tip, screen_size):
-        x = int(tip.x * screen_size[0])
-        y = int(tip.y * screen_size[1])
-        nx = self.prev_x + (x - self.prev_x) * self.smooth_factor
-        ny = self.prev_y + (y - self.prev_y) * self.smooth_factor
-        self.prev_x, self.prev_y = nx, ny
-        return nx, ny
-
-    def detect_gestures(self, hands, now):
-        # ── 1) TWO‑THUMBS‑UP → maximize/restore ─────────────────────────────
-        if len(hands) >= 2:
-            thumbs_up = True
-            for h in hands[:2]:
-                # thumb tip above thumb MCP
-                if h.landmark[4].y >= h.landmark[2].y:
-                    thumbs_up = False
-                    break
-                # other fingers folded
-                for tip, base in [(8, 6), (12, 10), (16, 14), (20, 18)]:
-                    if h.landmark[tip].y < h.landmark[base].y:
-                        thumbs_up = False
-                        break
-            if thumbs_up and now >= self.cooldown_end:
-                self.show_resize_flag = True
-                self.cooldown_end = now + 1.0
-                # reset any ongoing drag‑resize
-                self.resizing = False
-                return
-
-        # ── 2) DRAG‑RESIZE (during cooldown if started) ──────────────────────
-        if now < self.cooldown_end and self.resizing:
-            # use first hand to drag-resize
-            lm = hands[0].landmark[8]
-            dx = lm.x - self.initial_hand_x
-            new_w = int(self.initial_win_w * (1 + dx))
-            new_h = int(self.initial_win_h * (1 + dx))
-            resize_active_window(new_w, new_h)
-            return
-
-        # ── 3) LEFT‑CLICK PINCH ───────────────────────────────────────────────
-        d_mid = self.norm_dist(hands[0].landmark[12], hands[0].landmark[4])
-        if d_mid < 0.04:
-            self.left_frame_count += 1
-            if self.left_frame_count >= 3:
-                if not self.left_active:
-                    self.left_active = True
-                    self.left_start = now
-                elif not self.left_holding and (now - self.left_start) > 0.5:
-                    pg.mouseDown(button='left')
-                    self.left_holding = True
-            return
-        else:
-            if self.left_active:
-                dur = now - self.left_start
-                if dur <= 0.5:
-                    pg.click(button='left')
-                elif self.left_holding:
-                    pg.mouseUp(button='left')
-                self.left_active = False
-                self.left_holding = False
-            self.left_frame_count = 0
-
-        # ── 4) RIGHT‑CLICK PINCH ──────────────────────────────────────────────
-        d_ring = self.norm_dist(hands[0].landmark[16], hands[0].landmark[4])
-        if d_ring < 0.04:
-            self.right_frame_count += 1
-            if self.right_frame_count >= 3:
-                if not self.right_active:
-                    self.right_active = True
-                    self.right_start = now
-                elif not self.right_holding and (now - self.right_start) > 0.5:
-                    pg.mouseDown(button='right')
-                    self.right_holding = True
-            return
-        else:
-            if self.right_active:
-                dur = now - self.right_start
-                if dur <= 0.5:
-                    pg.click(button='right')
-                elif self.right_holding:
-                    pg.mouseUp(button='right')
-                self.right_active = False
-                self.right_holding = False
-            self.right_frame_count = 0
-
-    def norm_dist(self, p1, p2):
-        return math.hypot(p1.x - p2.x, p1.y - p2.y)
-
-
-    def stop(self):
-        self.running = False
+    # without WS_EX_TRANSPARENT the window keeps its mouse input (the
+    # PiP preview is dragged around)
+    styles |= WS_EX_LAYERED | (WS_EX_TRANSPARENT if clickthrough else 0)
+    ctypes.windll.user32.SetWindowLongW(hwnd, GWL_EXSTYLE, styles)
+    # colour key 0 = black pixels are not drawn at all (skeleton overlay)
+    flags = LWA_ALPHA | (LWA_COLORKEY if black_transparent else 0)
+    ctypes.windll.user32.SetLayeredWindowAttributes(hwnd, 0, alpha, flags)
 
 
 def main():
@@ -241,59 +58,145 @@ def main():
     res_map = {"Low": (640, 480), "Medium": (1280, 720), "High": (1920, 1080)}
     cam_w, cam_h = res_map.get(cfg.get("camera_resolution"), (1280, 720))
 
-    # — 2b) Gesture-recognition → confidences —
-    gr = cfg.get("gesture_recognition", "Medium")
-    det_c, track_c = {"Low": (0.3, 0.3), "Medium": (0.7, 0.7), "High": (0.9, 0.9)}[gr]
-
-    # — 3) Cursor smoothing factor —
-    interp = cfg.get("cursor_smoothing", {}).get("interpolation", 80) / 100.0
-
-    # — 4) Mirror transparency → window alpha —
+    # — 3) Mirror transparency → window alpha —
     alpha = int(cfg.get("mirror_transparency", 40) * 2.55)
 
-    pg.FAILSAFE = True
-    pg.PAUSE = 0
-
-    # start camera & recognizer
-    stream = WebcamStream(0, cam_w, cam_h).start()
-    recognizer = HandGestureRecognizer(stream)
-    recognizer.smooth_factor = interp
-    # override MediaPipe confidences
-    recognizer.hands = mp.solutions.hands.Hands(
-        static_image_mode=False,
-        model_complexity=1,
-        max_num_hands=2,
-        min_detection_confidence=det_c,
-        min_tracking_confidence=track_c
-    )
+    # — 4) Cursor / click output backend —
+    backend = make_backend(cfg.get("input", {}))
+
+    # — 5) Stage timing histograms (F9) and Perfetto trace (F10) —
+    prof_cfg = cfg.get("profiling", {})
+    tracer = Tracer(prof_cfg.get("trace_events", 200000), prof_cfg.get("trace", False))
+    profiler = StageTimer(prof_cfg.get("enabled", False), tracer)
+    dump_file = prof_cfg.get("dump_file")
+    trace_file = prof_cfg.get("trace_file", "trace.json")
+    install_dump_signal(profiler, dump_file)
+
+    # start camera & recognizer (mapping, governors, gates — see build_recognizer)
+    stream = WebcamStream(0, cam_w, cam_h, profiler).start()
+    recognizer = build_recognizer(cfg, stream, backend, profiler)
+    governor, mapper = recognizer.governor, recognizer.mapper
     recognizer.start()
 
+    # — 6) Session recording of raw frames (F8 starts / stops) —
+    rec_cfg = cfg.get("recording", {})
+    if rec_cfg.get("enabled", False):
+        stream.recorder = make_recorder(rec_cfg, cfg)
+
     # build full-screen click-through camera window
     window = tk.Tk()
     window.title("CameraOverlay")
-    window.attributes('-fullscreen', True)
+    # screen geometry is read once and again only when the display changes
+    screen = (window.winfo_screenwidth(), window.winfo_screenheight())
+
+    # "mirror" shows the camera image; "skeleton" only the tracked hand on
+    # a transparent background, drawn as canvas items; "pip" the camera
+    # image in a small corner window plus a ring at the cursor
+    overlay_cfg = cfg.get("overlay", {})
+    mode = overlay_cfg.get("mode", "mirror")
+    skeleton_mode, pip_mode = mode == "skeleton", mode == "pip"
+    if pip_mode:
+        pip_w, pip_h, pip_x, pip_y = pip_geometry(overlay_cfg, screen, (cam_w, cam_h))
+        window.geometry(f"{pip_w}x{pip_h}+{pip_x}+{pip_y}")
+    else:
+        window.attributes('-fullscreen', True)
     window.attributes('-topmost', True)
     window.overrideredirect(True)
     window.configure(bg='black')
 
-    label = tk.Label(window, bg='black')
+    if skeleton_mode:
+        label = tk.Canvas(window, bg='black', highlightthickness=0)
+    else:
+        label = tk.Label(window, bg='black')
     label.pack(fill="both", expand=True)
 
     window.update_idletasks()
     hwnd_cam = win32gui.FindWindow(None, "CameraOverlay")
-    make_window_clickthrough(hwnd_cam, alpha)
+    make_window_clickthrough(hwnd_cam, alpha, black_transparent=skeleton_mode,
+                             clickthrough=not pip_mode)
+
+    renderer = make_renderer(overlay_cfg, screen, (cam_w, cam_h))
+    skeleton = SkeletonOverlay(label, screen) if skeleton_mode else None
+    marker = None
+    if pip_mode:
+        marker_window = tk.Toplevel(window)
+        marker_window.title("CursorMarker")
+        marker_window.attributes('-topmost', True)
+        marker_window.overrideredirect(True)
+        marker_canvas = tk.Canvas(marker_window, bg='black', highlightthickness=0)
+        marker_canvas.pack(fill="both", expand=True)
+        marker = CursorMarker(marker_window, marker_canvas)
+        marker_window.update_idletasks()
+        make_window_clickthrough(win32gui.FindWindow(None, "CursorMarker"), 255,
+                                 black_transparent=True)
+
+        # drag the preview anywhere with the mouse
+        drag = [0, 0]
+
+        def start_drag(e):
+            drag[:] = [e.x, e.y]
+
+        def drag_to(e):
+            window.geometry(f"+{e.x_root - drag[0]}+{e.y_root - drag[1]}")
+
+        label.bind("<ButtonPress-1>", start_drag)
+        label.bind("<B1-Motion>", drag_to)
+    display_check = [time.time()]
+    # one PhotoImage, repainted in place while the size holds; below Full
+    # quality it holds the small image and Tk zooms it into the shown one
+    photo = [None]
+    shown = [None]
+
+    # the capture thread (recognizer in skeleton mode) only records the new
+    # seq — it never calls into Tk, so a busy Tk thread cannot stall capture
+    gate = RepaintGate()
+    if skeleton_mode:
+        recognizer.on_hands = gate.notify
+    else:
+        stream.on_frame = gate.notify
+
+    def overlay_loop():
+        # the governor's overlay interval is the minimum gap between
+        # repaints (longer while idle or asleep)
+        if gate.pending() and \
+                gate.wait(governor.overlay_interval_ms() / 1000.0, time.perf_counter()) == 0:
+            repaint()
+        window.after(OVERLAY_POLL_MS, overlay_loop)
+
+    def repaint():
+        if skeleton is not None:
+            seq, hands = recognizer.latest_hands
+            if gate.take(seq, time.perf_counter()):
+                t = time.perf_counter()
+                skeleton.update(hands, recognizer.gesture_state())
+                profiler.lap("overlay_paint", t, seq)
+            return
+        seq, frame = stream.read_seq()
+        if frame is None or not gate.take(seq, time.perf_counter()):
+            return
+        t = time.perf_counter()
+        image = renderer.render(frame)
+        if pip_mode:
+            draw_hands(renderer.screen, recognizer.latest_hands[1], recognizer.gesture_state())
+        t = profiler.lap("overlay_convert", t, seq)
+        if photo[0] is None or (photo[0].width(), photo[0].height()) != image.size:
+            photo[0] = ImageTk.PhotoImage(image=image)
+            shown[0] = photo[0] if renderer.divisor == 1 else tk.PhotoImage(
+                width=renderer.screen_size[0], height=renderer.screen_size[1])
+            label.configure(image=shown[0])
+        else:
+            photo[0].paste(image)
+        if marker is not None:
+            marker.update(backend.last_x, backend.last_y, recognizer.gesture_state())
+        t = profiler.lap("overlay_paint", t, seq)
+        if shown[0] is not photo[0]:
+            # Tk writes every screen pixel here whatever the divisor — timed
+            # apart so the saving upstream is not overstated
+            d = renderer.divisor
+            window.tk.call(shown[0], "copy", photo[0], "-zoom", d, d)
+            profiler.lap("overlay_zoom", t, seq)
 
     def update_loop():
-        frame = stream.read()
-        if frame is not None:
-            img = cv2.flip(frame, 1)
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            img = cv2.resize(img, (window.winfo_screenwidth(),
-                                   window.winfo_screenheight()))
-            imgtk = ImageTk.PhotoImage(image=Image.fromarray(img))
-            label.imgtk = imgtk
-            label.configure(image=imgtk)
-
         # process Qt events (for any unused overlays)
         qt_app.processEvents()
 
@@ -309,10 +212,87 @@ def main():
                     win32gui.ShowWindow(hwnd, win32con.SW_MAXIMIZE)
             recognizer.show_resize_flag = False
 
-        window.after(5, update_loop)
-
-    window.bind("<Escape>", lambda e: (stream.stop(), recognizer.stop(), window.destroy()))
+        # ── Re-fit the mapping only when the display layout changed ────────
+        now = time.time()
+        if now - display_check[0] > 1.0:
+            display_check[0] = now
+            if mapper.check_display():
+                screen = (window.winfo_screenwidth(), window.winfo_screenheight())
+                if not pip_mode:
+                    renderer.set_screen(screen)
+                if skeleton is not None:
+                    skeleton.set_screen(screen)
+
+        window.after(HOUSEKEEPING_MS, update_loop)
+
+    def toggle_calibration(_):
+        # F7 starts sampling the fingertip; sweep the comfortable reach of
+        # the hand, F7 again fits the active box to it and saves it
+        samples = recognizer.calibration
+        if samples is None:
+            recognizer.calibration = []
+            print("Calibrating the active box — sweep your reach, then press F7")
+            return
+        recognizer.calibration = None
+        if not samples:
+            return
+        xs, ys = zip(*samples)
+        region = [round(v, 3) for v in mapper.calibrate(xs, ys)]
+        print(f"Active box {region}")
+        if len(sys.argv) > 1:
+            cfg.setdefault("mapping", {})["active_region"] = region
+            try:
+                with open(sys.argv[1], "w", encoding="utf-8") as f:
+                    json.dump(cfg, f, indent=2)
+            except OSError as e:
+                print(f"Failed to save config: {e}")
+
+    def toggle_profiling(_):
+        profiler.enabled = not profiler.enabled
+
+    def toggle_tracing(_):
+        tracer.enabled = not tracer.enabled
+        if not tracer.enabled:
+            tracer.export(trace_file)
+
+    def toggle_recording(_):
+        recorder = stream.recorder
+        if recorder is None:
+            stream.recorder = make_recorder(rec_cfg, cfg)
+        else:
+            stream.recorder = None
+            recorder.close(wait=False)
+            report_when_written(recorder)
+
+    def report_when_written(recorder):
+        # the writer is still draining its queue — counts are final only
+        # once it has finished, and Tk must not block waiting for it
+        if recorder.thread.is_alive():
+            window.after(HOUSEKEEPING_MS, report_when_written, recorder)
+        else:
+            print(recorder.status())
+
+    def quit_session(_):
+        stream.on_frame = recognizer.on_hands = None
+        stream.stop()
+        recognizer.stop()
+        backend.close()
+        if stream.recorder is not None:
+            stream.recorder.close()
+            print(stream.recorder.status())
+        if profiler.enabled:
+            profiler.dump(dump_file)
+        if tracer.enabled:
+            tracer.export(trace_file)
+        window.destroy()
+
+    window.bind("<F7>", toggle_calibration)
+    window.bind("<F8>", toggle_recording)
+    window.bind("<F9>", toggle_profiling)
+    window.bind("<F10>", toggle_tracing)
+    window.bind("<Escape>", quit_session)
     update_loop()
+    overlay_loop()
     window.mainloop()
 
 
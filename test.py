@@ -14,6 +14,7 @@ class WebcamStream:
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
         self.ret, self.frame = self.cap.read()
         self.stopped = False
+        self.on_frame = None  # called on the capture thread after every read
 
     def start(self):
         Thread(target=self.update, daemon=True).start()
@@ -22,6 +23,8 @@ class WebcamStream:
     def update(self):
         while not self.stopped:
             self.ret, self.frame = self.cap.read()
+            if self.on_frame is not None:
+                self.on_frame()
 
     def read(self):
         return self.frame
@@ -115,6 +118,9 @@ class HandGestureRecognizer:
         self.running = False
 
 class TransparentOverlay(QtWidgets.QMainWindow):
+    # emitted from the capture thread; Qt queues it to the GUI thread
+    frame_ready = QtCore.pyqtSignal()
+
     def __init__(self, stream):
         super().__init__()
         self.stream = stream
@@ -138,11 +144,19 @@ class TransparentOverlay(QtWidgets.QMainWindow):
         container.setLayout(layout)
         self.setCentralWidget(container)
 
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.update_frame)
-        self.timer.start(30)
+        # repaint once per camera frame instead of on a 30 ms timer; at most
+        # one repaint is queued at a time
+        self.pending = False
+        self.frame_ready.connect(self.update_frame)
+        stream.on_frame = self.notify
+
+    def notify(self):
+        if not self.pending:
+            self.pending = True
+            self.frame_ready.emit()
 
     def update_frame(self):
+        self.pending = False
         frame = self.stream.read()
         if frame is not None:
             frame = cv2.flip(frame, 1)